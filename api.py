@@ -1,16 +1,32 @@
-from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi import FastAPI, HTTPException, Request, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import anyio
+import atexit
+import queue
 import json
+import copy
 import datetime
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 import time
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from cachetools import TTLCache
+from config import (
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, WORKER_THREAD_LIMIT, SCORING_BATCH_SIZE, SCORING_BATCH_DELAY,
+    DB_WRITE_QUEUE_SIZE, DB_WRITE_BATCH_SIZE, DB_WRITE_BATCH_INTERVAL,
+    MODEL_PATH, SYNTHETIC_DATA_SIZE, SLOW_REQUEST_THRESHOLD, ENABLE_DB
+)
 from risk_scoring import RiskScorer
-from data_generator import generate_synthetic_fiat_data
-from utils import is_valid_ip, is_valid_eth_address
+from utils import is_valid_ip, is_valid_eth_address, ISO_COUNTRY_CODES
 from sqlalchemy.orm import Session
-from models import Transaction, db
+from models import Transaction
+from database import SessionLocal, create_tables
 
 # Configure logging
 logging.basicConfig(
@@ -19,11 +35,179 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Emit log records from a background thread so request handlers never block on log I/O
+_root_logger = logging.getLogger()
+_log_handlers = list(_root_logger.handlers)
+_log_listener: Optional[QueueListener] = None
+
+def _start_log_listener() -> None:
+    """Route root log records through a new queue to a new listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        # Inherited from the parent process, whose listener thread doesn't exist here
+        atexit.unregister(_log_listener.stop)
+    
+    log_queue = queue.Queue(-1)
+    _log_listener = QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+    _root_logger.handlers = [QueueHandler(log_queue)]
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+_start_log_listener()
+
+def restart_log_listener() -> None:
+    """
+    Give a process forked after import (e.g. a Gunicorn worker) its own log queue and listener
+    
+    The inherited queue's lock may have been held by the parent's listener thread at
+    fork time, and a started QueueListener can't be started again on Python 3.13+.
+    """
+    _start_log_listener()
+
+# Queue of (transaction, results) pairs waiting for the background database writer
+_db_queue: Optional[asyncio.Queue] = None
+
+def _write_batch(batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    """
+    Persist a batch of analysed transactions in a single commit
+    
+    Args:
+        batch: List of (transaction, analysis results) pairs
+    """
+    records = []
+    for transaction_dict, results in batch:
+        try:
+            records.append(Transaction.from_api_result(transaction_dict, results))
+        except Exception as record_error:
+            logger.error(f"Failed to build transaction record: {record_error}")
+    
+    if not records:
+        return
+    
+    try:
+        # Commits on success; rolls back and closes the session on error
+        with SessionLocal.begin() as db_session:
+            db_session.add_all(records)
+        logger.info(f"Saved {len(records)} transactions to database")
+    except Exception as db_error:
+        logger.error(f"Failed to save transactions to database: {db_error}")
+
+async def _next_batch(queue: asyncio.Queue, max_size: int, max_delay: float) -> Tuple[List[Any], bool]:
+    """
+    Wait for the next queued item, then keep collecting until max_size items
+    have arrived or max_delay seconds have passed
+    
+    Args:
+        queue: Queue to read from; a None item asks the consumer to stop
+        max_size: Maximum number of items in the batch
+        max_delay: Maximum time in seconds to wait for the batch to fill
+        
+    Returns:
+        Tuple[List[Any], bool]: The batch and whether the stop item was received
+    """
+    item = await queue.get()
+    if item is None:
+        return [], True
+    
+    loop = asyncio.get_running_loop()
+    batch = [item]
+    deadline = loop.time() + max_delay
+    while len(batch) < max_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    
+    return batch, False
+
+async def _db_writer(queue: asyncio.Queue) -> None:
+    """
+    Drain the write queue, committing up to DB_WRITE_BATCH_SIZE transactions
+    at a time or whatever arrived within DB_WRITE_BATCH_INTERVAL seconds.
+    A None item stops the writer after flushing the current batch.
+    """
+    stopping = False
+    while not stopping:
+        batch, stopping = await _next_batch(queue, DB_WRITE_BATCH_SIZE, DB_WRITE_BATCH_INTERVAL)
+        if not batch:
+            continue
+        
+        # The SQLAlchemy session is synchronous, so commit off the event loop
+        try:
+            await anyio.to_thread.run_sync(_write_batch, batch)
+        except Exception as e:
+            logger.error(f"Database writer failed to save batch: {e}")
+
+def _queue_for_persistence(transaction_dict: Dict[str, Any], results: Dict[str, Any]) -> None:
+    """Hand an analysis to the background writer without blocking the request"""
+    if not ENABLE_DB:
+        return
+    if _db_queue is None:
+        logger.warning("Database writer is not running, transaction not saved")
+        return
+    try:
+        _db_queue.put_nowait((transaction_dict, results))
+    except asyncio.QueueFull:
+        logger.warning("Database write queue is full, transaction not saved")
+
+def warm_start_models() -> None:
+    """Load the trained models from MODEL_PATH, training and saving them if missing"""
+    # Already loaded, e.g. by the Gunicorn master before forking this worker
+    if risk_scorer.fiat_analyzer.is_trained:
+        return
+    
+    risk_scorer.load_or_train(MODEL_PATH, SYNTHETIC_DATA_SIZE)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the scoring batcher and database writer, and flush both on shutdown"""
+    global _db_queue, _score_queue
+    # Scoring runs in worker threads, so allow more than AnyIO's default of 40
+    anyio.to_thread.current_default_thread_limiter().total_tokens = WORKER_THREAD_LIMIT
+    await anyio.to_thread.run_sync(warm_start_models)
+    
+    writer_task = None
+    if ENABLE_DB:
+        # Schema setup belongs to a one-off `python -m database` per deploy; running it
+        # in every worker would race the DDL, so it is opt-in here as in app_unified
+        if os.environ.get('RUN_DB_INIT') == '1':
+            try:
+                await anyio.to_thread.run_sync(create_tables)
+            except Exception as e:
+                logger.error(f"Could not create database tables: {e}")
+        
+        _db_queue = asyncio.Queue(maxsize=DB_WRITE_QUEUE_SIZE)
+        writer_task = asyncio.create_task(_db_writer(_db_queue))
+    else:
+        logger.info("Database disabled (ENABLE_DB=0), transactions will not be stored")
+    
+    _score_queue = asyncio.Queue()
+    batcher_task = asyncio.create_task(_scoring_batcher(_score_queue))
+    try:
+        yield
+    finally:
+        score_queue, _score_queue = _score_queue, None
+        await score_queue.put(None)
+        await batcher_task
+        
+        if writer_task is not None:
+            db_queue, _db_queue = _db_queue, None
+            await db_queue.put(None)
+            await writer_task
+
 # Create the FastAPI app
 app = FastAPI(
     title="AI Fraud Detection for ItisPay",
     description="Cross-Channel Fraud Detection API for fiat and crypto transactions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -35,61 +219,201 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the risk scorer
+# Initialize the risk scorer; models are loaded or trained in lifespan
 risk_scorer = RiskScorer()
 
-# Generate synthetic data and train the model
-fiat_data = generate_synthetic_fiat_data(1000)
-risk_scorer.train_models(fiat_data)
+# Cache of recent risk analyses, keyed on the fields that drive the score; entries
+# expire so crypto scores pick up new Etherscan data
+_score_cache = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+_score_cache_lock = threading.RLock()
+
+def _score_cache_key(transaction: Dict[str, Any]) -> Tuple:
+    """
+    Build a hashable cache key from a transaction dict
+    
+    Amounts are rounded so that equivalent requests share a cache entry.
+    """
+    fiat = transaction.get('fiat') or {}
+    crypto = transaction.get('crypto') or {}
+    return (
+        round(fiat['amount'], 2) if fiat else None,
+        fiat.get('currency'),
+        fiat.get('card_country'),
+        fiat.get('geo_ip'),
+        crypto.get('address'),
+        crypto.get('currency'),
+        round(crypto['amount'], 6) if crypto else None
+    )
+
+async def _cached_score(key: Tuple, transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the risk analysis for a transaction, reusing a cached result when available
+    
+    Cache misses are scored in a worker thread, batched together with other
+    in-flight requests, so the CPU-bound model call doesn't block the event loop.
+    
+    Args:
+        key: Cache key from _score_cache_key
+        transaction: Transaction dict passed to the risk scorer on a cache miss
+        
+    Returns:
+        Dict[str, Any]: A private copy of the analysis results
+    """
+    with _score_cache_lock:
+        results = _score_cache.get(key)
+    
+    if results is None:
+        results = await _score_in_batch(transaction)
+        with _score_cache_lock:
+            _score_cache[key] = results
+    
+    # Callers add per-request fields, so never hand out the cached dict itself
+    return copy.deepcopy(results)
+
+# Queue of (transaction, future) pairs waiting to be scored together
+_score_queue: Optional[asyncio.Queue] = None
+
+async def _finish_scoring(transaction: Dict[str, Any], future: asyncio.Future,
+                          fiat_result: Optional[Tuple[float, List[str]]], fiat_scored: bool) -> None:
+    """
+    Complete one transaction's analysis and resolve its future as soon as it is done
+    
+    Args:
+        transaction: Transaction dict being scored
+        future: Future the waiting request is awaiting
+        fiat_result: Fiat result from the batched model call
+        fiat_scored: False if the batched fiat call failed and the transaction must be scored alone
+    """
+    try:
+        if not fiat_scored:
+            result = await anyio.to_thread.run_sync(risk_scorer.analyze_transaction, transaction)
+        elif transaction.get('crypto'):
+            # Etherscan lookups block, so each crypto transaction gets its own worker thread
+            result = await anyio.to_thread.run_sync(risk_scorer.complete_analysis, transaction, fiat_result)
+        else:
+            # Combining an existing fiat result is cheap enough to do on the event loop
+            result = risk_scorer.complete_analysis(transaction, fiat_result)
+    except Exception as e:
+        if not future.done():
+            future.set_exception(e)
+        return
+    
+    if not future.done():
+        future.set_result(result)
+
+async def _score_batch(batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+    """
+    Score the fiat components of a batch with one model call, then finish each
+    transaction separately so no request waits on another's crypto lookups
+    """
+    transactions = [transaction for transaction, _ in batch]
+    try:
+        fiat_results = await anyio.to_thread.run_sync(risk_scorer.analyze_fiat_batch, transactions)
+        fiat_scored = True
+    except Exception as e:
+        # Score each transaction alone so a bad row only fails its own request
+        logger.warning("Batched fiat scoring failed, scoring transactions individually: %s", e)
+        fiat_results = [None] * len(batch)
+        fiat_scored = False
+    
+    await asyncio.gather(*(
+        _finish_scoring(transaction, future, fiat_result, fiat_scored)
+        for (transaction, future), fiat_result in zip(batch, fiat_results)
+    ))
+
+async def _scoring_batcher(queue: asyncio.Queue) -> None:
+    """
+    Group concurrent scoring requests into batches of up to SCORING_BATCH_SIZE,
+    waiting at most SCORING_BATCH_DELAY seconds for a batch to fill.
+    A None item stops the batcher once pending batches finish.
+    """
+    pending = set()
+    stopping = False
+    while not stopping:
+        batch, stopping = await _next_batch(queue, SCORING_BATCH_SIZE, SCORING_BATCH_DELAY)
+        if not batch:
+            continue
+        
+        # Keep collecting while this batch is scored
+        task = asyncio.create_task(_score_batch(batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
+    if pending:
+        await asyncio.gather(*pending)
+
+async def _score_in_batch(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue a transaction for the scoring batcher and wait for its result"""
+    if _score_queue is None:
+        # Batcher not running (e.g. outside the app lifespan), score directly
+        return await anyio.to_thread.run_sync(risk_scorer.analyze_transaction, transaction)
+    
+    future = asyncio.get_running_loop().create_future()
+    await _score_queue.put((transaction, future))
+    return await future
 
 # Define the request models
+# Request models are immutable, reject unknown fields and trim string input
+REQUEST_MODEL_CONFIG = ConfigDict(frozen=True, extra='forbid', str_strip_whitespace=True)
+
+SUPPORTED_CRYPTO_CURRENCIES = frozenset(['ETH', 'BTC', 'USDT', 'USDC'])
+
 class FiatTransaction(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     amount: float = Field(..., description="Transaction amount", gt=0)
     currency: str = Field(..., description="Currency code (e.g., USD, EUR)")
     card_country: str = Field(..., description="Card issuing country (2-letter code)")
     geo_ip: str = Field(..., description="IP address or country code of the transaction")
     
-    @validator('card_country')
+    @field_validator('card_country')
+    @classmethod
     def validate_card_country(cls, v):
         if len(v) != 2:
             raise ValueError('card_country must be a 2-letter country code')
         return v
     
-    @validator('geo_ip')
+    @field_validator('geo_ip')
+    @classmethod
     def validate_geo_ip(cls, v):
-        if len(v) == 2:  # Country code
+        if v.upper() in ISO_COUNTRY_CODES:  # Country code
             return v
         if not is_valid_ip(v):
             raise ValueError('geo_ip must be a valid IP address or 2-letter country code')
         return v
 
 class CryptoTransaction(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     address: str = Field(..., description="Crypto wallet address")
     currency: str = Field(..., description="Cryptocurrency (e.g., ETH, BTC)")
     amount: float = Field(..., description="Transaction amount", gt=0)
     
-    @validator('address')
+    @field_validator('address')
+    @classmethod
     def validate_address(cls, v):
         if not is_valid_eth_address(v):
             raise ValueError('address must be a valid Ethereum address')
         return v
     
-    @validator('currency')
+    @field_validator('currency')
+    @classmethod
     def validate_currency(cls, v):
-        supported = ['ETH', 'BTC', 'USDT', 'USDC']
-        if v not in supported:
-            raise ValueError(f'currency must be one of {supported}')
+        if v not in SUPPORTED_CRYPTO_CURRENCIES:
+            raise ValueError(f'currency must be one of {sorted(SUPPORTED_CRYPTO_CURRENCIES)}')
         return v
 
 class TransactionRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     fiat: Optional[FiatTransaction] = Field(None, description="Fiat transaction details")
     crypto: Optional[CryptoTransaction] = Field(None, description="Crypto transaction details")
     
-    @validator('fiat', 'crypto')
-    def validate_at_least_one(cls, v, values):
-        if 'fiat' not in values and v is None:
+    @model_validator(mode='after')
+    def validate_at_least_one(self):
+        if self.fiat is None and self.crypto is None:
             raise ValueError('At least one of fiat or crypto must be provided')
-        return v
+        return self
 
 class RiskResponse(BaseModel):
     risk_score: float = Field(..., description="Overall risk score (0-100)")
@@ -102,31 +426,32 @@ class RiskResponse(BaseModel):
 # Database dependency
 def get_db():
     """FastAPI Dependency for getting a database session"""
-    try:
-        # Create a new database session
-        db_session = db.session
+    if not ENABLE_DB:
+        raise HTTPException(status_code=503, detail="Transaction storage is disabled")
+    
+    # Closes the session, rolling back anything uncommitted, when the request ends
+    with SessionLocal() as db_session:
         yield db_session
-    finally:
-        # Close the session
-        db_session.close()
 
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Get client IP
     client_ip = request.client.host if request.client else "Unknown"
     
     # Log the request
-    logger.info(f"Request from {client_ip}: {request.method} {request.url.path}")
+    logger.info("Request from %s: %s %s", client_ip, request.method, request.url.path)
     
     # Process the request
     response = await call_next(request)
     
     # Log the response time
-    process_time = time.time() - start_time
-    logger.info(f"Response time: {process_time:.4f}s")
+    process_time = time.perf_counter() - start_time
+    logger.info("Response time: %.4fs", process_time)
+    if process_time > SLOW_REQUEST_THRESHOLD:
+        logger.warning("Slow request: %s %s took %.4fs", request.method, request.url.path, process_time)
     
     return response
 
@@ -146,50 +471,45 @@ async def root():
         ]
     }
 
-@app.post("/fraud-check", response_model=RiskResponse)
-async def fraud_check(transaction: TransactionRequest, db_session: Session = Depends(get_db)):
+@app.get("/ui", include_in_schema=False)
+async def ui_redirect():
+    """Redirect to the proxied UI path (previously served by a separate Flask app)"""
+    return RedirectResponse("/proxy/8000", status_code=307)
+
+# Results are built by the risk scorer, so skip response_model revalidation
+@app.post("/fraud-check", response_model=None, responses={200: {"model": RiskResponse}})
+async def fraud_check(transaction: TransactionRequest):
     """
-    Analyze a transaction for fraud risk and store in database
+    Analyze a transaction for fraud risk and queue it for storage in the database
     
     Args:
         transaction: Transaction details with fiat and/or crypto components
-        db_session: Database session (injected by FastAPI)
         
     Returns:
         RiskResponse: Risk analysis results
     """
-    start_time = time.time()
-    logger.info(f"Received fraud check request: {transaction}")
+    start_time = time.perf_counter()
+    logger.debug("Received fraud check request: %r", transaction)
     
     # Convert Pydantic model to dict
-    transaction_dict = transaction.dict()
+    transaction_dict = transaction.model_dump(exclude_unset=True)
     
     try:
-        # Analyze the transaction
-        results = risk_scorer.analyze_transaction(transaction_dict)
+        # Analyze the transaction (memoized for repeat traffic)
+        results = await _cached_score(_score_cache_key(transaction_dict), transaction_dict)
         
         # Add processing time
-        results['processing_time'] = round(time.time() - start_time, 4)
+        results['processing_time'] = round(time.perf_counter() - start_time, 4)
         
-        # Store the transaction and analysis in the database
-        try:
-            # Create a transaction record from the API result
-            db_transaction = Transaction.from_api_result(transaction_dict, results)
-            
-            # Add and commit to the database
-            db_session.add(db_transaction)
-            db_session.commit()
-            
-            logger.info(f"Transaction saved to database with ID: {db_transaction.id}")
-        except Exception as db_error:
-            logger.error(f"Failed to save transaction to database: {db_error}")
-            # Don't fail the API response if database save fails
-            db_session.rollback()
+        # Store the transaction and analysis in the background
+        # Don't fail or delay the API response on database writes
+        _queue_for_persistence(transaction_dict, results)
         
-        return results
+        # Leave out empty components, as response_model_exclude_none would
+        return ORJSONResponse({key: value for key, value in results.items() if value is not None})
     except Exception as e:
         logger.error(f"Error analyzing transaction: {e}")
-        processing_time = round(time.time() - start_time, 4)
+        processing_time = round(time.perf_counter() - start_time, 4)
         raise HTTPException(
             status_code=500,
             detail={
@@ -209,18 +529,17 @@ class TransactionHistoryItem(BaseModel):
     risk_score: float
     risk_level: str
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TransactionHistoryResponse(BaseModel):
     transactions: List[TransactionHistoryItem]
-    total: int
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page, or null on the last page")
 
 @app.get("/transactions", response_model=TransactionHistoryResponse)
-async def get_transaction_history(
+def get_transaction_history(
     db_session: Session = Depends(get_db),
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1),
+    cursor: Optional[int] = None,
     min_risk: Optional[float] = None,
     max_risk: Optional[float] = None,
     transaction_type: Optional[str] = None
@@ -231,18 +550,27 @@ async def get_transaction_history(
     Args:
         db_session: Database session
         limit: Maximum number of transactions to return
-        offset: Number of transactions to skip
+        cursor: next_cursor from the previous page; only older transactions are returned
         min_risk: Minimum risk score filter
         max_risk: Maximum risk score filter
         transaction_type: Filter by transaction type (fiat, crypto, or both)
         
     Returns:
-        List of transactions
+        Page of transactions, newest first, and the cursor for the next page
     """
-    logger.info(f"Getting transaction history with filters: min_risk={min_risk}, max_risk={max_risk}, type={transaction_type}")
+    logger.info("Getting transaction history with filters: min_risk=%s, max_risk=%s, type=%s",
+                min_risk, max_risk, transaction_type)
     
-    # Build the query
-    query = db_session.query(Transaction)
+    # Build the query, selecting only the columns in TransactionHistoryItem
+    query = db_session.query(
+        Transaction.id,
+        Transaction.transaction_type,
+        Transaction.amount,
+        Transaction.currency,
+        Transaction.timestamp,
+        Transaction.risk_score,
+        Transaction.risk_level
+    )
     
     # Apply filters
     if min_risk is not None:
@@ -254,15 +582,17 @@ async def get_transaction_history(
     if transaction_type:
         query = query.filter(Transaction.transaction_type == transaction_type)
     
-    # Get total count for pagination
-    total_count = query.count()
+    # Keyset pagination: seek past the cursor instead of counting and skipping rows
+    if cursor is not None:
+        query = query.filter(Transaction.id < cursor)
     
-    # Apply pagination and get results
-    transactions = query.order_by(Transaction.timestamp.desc()).offset(offset).limit(limit).all()
+    # Fetch one extra row to learn whether another page exists
+    transactions = query.order_by(Transaction.id.desc()).limit(limit + 1).all()
+    next_cursor = transactions[limit - 1].id if len(transactions) > limit else None
     
     return {
-        "transactions": transactions,
-        "total": total_count
+        "transactions": transactions[:limit],
+        "next_cursor": next_cursor
     }
 
 @app.get("/health")
@@ -1,7 +1,16 @@
+"""
+Run the FastAPI app with uvloop/httptools across several worker processes.
+
+For production, Gunicorn can manage the same workers:
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -w $(nproc) -b 0.0.0.0:8000 api:app
+"""
+
 import os
+import sys
 import logging
 import uvicorn
 import time
+from config import API_WORKERS
 
 # Configure logging
 logging.basicConfig(
@@ -10,14 +19,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import the FastAPI app
-from api import app
-
 def start_fastapi():
     """Start the FastAPI server"""
-    logger.info("Starting FastAPI server...")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    logger.info(f"Starting FastAPI server with {API_WORKERS} workers...")
+    # Workers import the app themselves, so pass it as an import string
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=API_WORKERS,
+        log_level="info"
+    )
 
 if __name__ == "__main__":
     # Start FastAPI in the main thread
-    start_fastapi()
\ No newline at end of file
+    start_fastapi()
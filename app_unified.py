@@ -4,19 +4,35 @@ This file combines all components (Flask, FastAPI, DB) into a single Flask appli
 """
 
 import os
+import sys
 import logging
-import json
+import gzip
+import hashlib
+import re
+import orjson
 from datetime import datetime
 import pandas as pd
-import numpy as np
 import time
-from flask import Flask, render_template, redirect, request, jsonify, render_template_string
+import atexit
+import queue
+import sqlite3
+import threading
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, Response, redirect, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from models import Transaction, db
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from models import Transaction, db, migrate_risk_level_codes, create_missing_indexes
 from risk_scoring import RiskScorer
-from data_generator import generate_synthetic_fiat_data, generate_sample_transaction
-import plotly.express as px
-import plotly.graph_objects as go
+from data_generator import generate_sample_transaction
+from utils import RISK_LEVELS
+from config import (
+    MODEL_PATH, SYNTHETIC_DATA_SIZE, SAMPLE_REFRESH_INTERVAL, DB_POOL_RECYCLE, DB_ASYNC_COMMIT,
+    BULK_MAX_TRANSACTIONS, STATIC_ASSET_MAX_AGE, DB_WRITE_QUEUE_SIZE, DB_WRITE_BATCH_SIZE,
+    DB_WRITE_BATCH_INTERVAL
+)
 
 # Configure logging
 logging.basicConfig(
@@ -25,1112 +41,483 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Emit log records from a background thread so request handlers never block on log I/O.
+# Under gevent workers (see gunicorn.conf.py) threads are greenlets that would share the
+# request loop anyway, so records are written directly there.
+_gevent_monkey = sys.modules.get('gevent.monkey')
+_root_logger = logging.getLogger()
+_log_handlers = list(_root_logger.handlers)
+_log_listener = None
+
+def _start_log_listener():
+    """Route root log records through a new queue to a new listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        # Inherited from the parent process, whose listener thread doesn't exist here
+        atexit.unregister(_log_listener.stop)
+    
+    log_queue = queue.Queue(-1)
+    _log_listener = QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+    _root_logger.handlers = [QueueHandler(log_queue)]
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+if _gevent_monkey is None or not _gevent_monkey.is_module_patched('threading'):
+    _start_log_listener()
+
+def restart_log_listener():
+    """
+    Give a process forked after import (e.g. a Gunicorn worker) its own log queue and listener
+    
+    The inherited queue's lock may have been held by the parent's listener thread at
+    fork time, and a started QueueListener can't be started again on Python 3.13+.
+    """
+    if _log_listener is not None:
+        _start_log_listener()
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider that encodes with orjson, used by jsonify and request.json"""
+    
+    # NumPy scalars and arrays from the models serialize without conversion
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.options).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.options), mimetype='application/json')
+
 # Initialize the Flask app
 logger.info("Initializing Flask app")
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Match routes with or without a trailing slash instead of answering with a redirect
+app.url_map.strict_slashes = False
 
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_recycle": DB_POOL_RECYCLE,
+    # Recycling handles stale connections without a SELECT 1 on every checkout
+    "pool_pre_ping": False,
+    "pool_reset_on_return": "rollback",
 }
+if DB_ASYNC_COMMIT and (app.config["SQLALCHEMY_DATABASE_URI"] or "").startswith("postgres"):
+    # Trades durability of the last few fraud logs on a crash for faster INSERTs
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"]["connect_args"] = {"options": "-c synchronous_commit=off"}
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+@event.listens_for(Engine, "connect")
+def enable_sqlite_wal(dbapi_connection, connection_record):
+    """Use write-ahead logging on SQLite so reads are not blocked by background commits"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+# Shared CSS is versioned in its URL, so browsers may keep it for a long time
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_ASSET_MAX_AGE
+
+@app.after_request
+def mark_static_immutable(response):
+    """Tell browsers not to revalidate versioned static files"""
+    if request.endpoint == 'static' and response.status_code == 200:
+        response.cache_control.immutable = True
+    return response
+
 # Initialize the database with the app
 db.init_app(app)
 
-# Initialize the risk scorer
+# Initialize the risk scorer from the saved models, training only if there are none.
+# Run Gunicorn with preload_app (see gunicorn.conf.py) so this happens once in the master.
 risk_scorer = RiskScorer()
+risk_scorer.load_or_train(MODEL_PATH, SYNTHETIC_DATA_SIZE)
 
-# Train the model with synthetic data
-fiat_data = generate_synthetic_fiat_data(1000)
-risk_scorer.train_models(fiat_data)
+def init_db():
+    """Create any missing database tables (create_all skips tables that already exist)"""
+    logger.info("Creating database tables if they don't exist")
+    db.create_all()
+    migrate_risk_level_codes(db.engine)
+    create_missing_indexes(db.engine)
 
-# Create database tables if they don't exist, but safely
-with app.app_context():
-    try:
-        logger.info("Creating database tables if they don't exist")
-        
-        # Check if tables already exist and create them only if needed
-        from sqlalchemy import inspect
-        inspector = inspect(db.engine)
-        existing_tables = inspector.get_table_names()
-        
-        if 'transactions' not in existing_tables:
-            logger.info("Tables don't exist, creating them")
-            db.create_all()
-        else:
-            logger.info("Tables already exist, skipping creation")
-    except Exception as e:
-        logger.error(f"Error during database setup: {e}")
-        # Continue running even if there's a database error
+@app.cli.command('db-init')
+def db_init_command():
+    """Create the database tables; run once per deploy with `flask --app app_unified db-init`"""
+    init_db()
 
-# HTML template for the landing page
-LANDING_PAGE_HTML = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ItisPay Fraud Detection</title>
-    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
-    <style>
-        body {
-            padding: 20px;
-            background-color: #1e1e1e;
-            color: #f0f0f0;
-            font-family: Arial, sans-serif;
-            min-height: 90vh;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-            text-align: center;
-        }
-        .btn {
-            margin: 10px;
-        }
-        .card {
-            margin: 20px 0;
-            background-color: #252525;
-            border: 1px solid #333;
-            padding: 15px;
-            border-radius: 5px;
-        }
-        .feature-list {
-            text-align: left;
-            margin: 20px auto;
-            max-width: 500px;
-        }
-        .feature-item {
-            margin: 10px 0;
-            display: flex;
-            align-items: flex-start;
-        }
-        .feature-icon {
-            margin-right: 10px;
-        }
-        .btn-link-custom {
-            display: inline-block;
-            padding: 12px 24px;
-            background-color: #007bff;
-            color: white;
-            text-decoration: none;
-            border-radius: 4px;
-            font-weight: bold;
-            margin: 10px;
-            text-align: center;
-            border: none;
-            cursor: pointer;
-        }
-        .btn-link-custom.secondary {
-            background-color: #6c757d;
-        }
-        .badge {
-            display: inline-block;
-            padding: 0.25em 0.6em;
-            font-size: 75%;
-            font-weight: 600;
-            text-align: center;
-            white-space: nowrap;
-            vertical-align: baseline;
-            border-radius: 0.375rem;
-            margin: 0 0.2rem;
-        }
-        .badge-success {
-            background-color: #28a745;
-            color: white;
-        }
-        .badge-info {
-            background-color: #17a2b8;
-            color: white;
-        }
-        .row {
-            display: flex;
-            flex-wrap: wrap;
-            margin-right: -15px;
-            margin-left: -15px;
-        }
-        .col-md-4 {
-            position: relative;
-            width: 100%;
-            padding-right: 15px;
-            padding-left: 15px;
-            flex: 0 0 33.333333%;
-            max-width: 33.333333%;
-        }
-        .mt-4 {
-            margin-top: 1.5rem;
-        }
-        .mb-3 {
-            margin-bottom: 1rem;
-        }
-        .mb-4 {
-            margin-bottom: 1.5rem;
-        }
-        .text-center {
-            text-align: center;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🛡️ ItisPay AI Fraud Detection</h1>
-        <p class="lead">
-            Cross-Channel Fraud Detection for Fiat and Cryptocurrency Transactions
-        </p>
-        
-        <div class="card">
-            <h3>About this System</h3>
-            <p>This AI-powered fraud detection system analyzes both fiat and crypto transactions to identify potential fraud risks.</p>
-            
-            <div class="feature-list">
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>Fiat transaction anomaly detection using Isolation Forest</div>
-                </div>
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>Crypto wallet analysis with Etherscan API integration</div>
-                </div>
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>Cross-channel risk scoring combining fiat and crypto signals</div>
-                </div>
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>Explainable risk alerts with specific fraud indicators</div>
-                </div>
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>PostgreSQL database for transaction history storage</div>
-                </div>
-                <div class="feature-item">
-                    <span class="feature-icon">✅</span>
-                    <div>Interactive transaction history with filtering and visualization</div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="card mt-4">
-            <h3>System Components <span class="badge badge-success">Active</span></h3>
-            <p>The ItisPay Fraud Detection system includes the following features:</p>
-            
-            <div class="row text-center mb-4">
-                <div class="col-md-4 mb-3">
-                    <h5>Fraud Check</h5>
-                    <p>Analyze new transactions</p>
-                </div>
-                <div class="col-md-4 mb-3">
-                    <h5>Transaction History</h5>
-                    <p>View past transactions</p>
-                </div>
-                <div class="col-md-4 mb-3">
-                    <h5>API Access</h5>
-                    <p>Integration options</p>
-                </div>
-            </div>
-        </div>
-        
-        <a href="/fraud-check" class="btn-link-custom">Fraud Detection</a>
-        <a href="/transaction-history" class="btn-link-custom secondary">Transaction History</a>
-        <a href="/api-docs" class="btn-link-custom" style="background-color: #17a2b8;">API Documentation</a>
-    </div>
-</body>
-</html>
-"""
+# Creating tables at import costs every worker a schema round trip, so it is opt-in
+if os.environ.get('RUN_DB_INIT') == '1':
+    with app.app_context():
+        try:
+            init_db()
+        except Exception as e:
+            logger.error("Error during database setup: %s", e)
+            # Continue running even if there's a database error
 
-API_DOCS_HTML = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ItisPay API Documentation</title>
-    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
-    <style>
-        body {
-            padding: 20px;
-            background-color: #1e1e1e;
-            color: #f0f0f0;
-            font-family: Arial, sans-serif;
-            min-height: 90vh;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-        }
-        pre {
-            background-color: #252525;
-            padding: 15px;
-            border-radius: 5px;
-            overflow-x: auto;
-        }
-        .endpoint {
-            background-color: #252525;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-        .method {
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-weight: bold;
-        }
-        .method.post {
-            background-color: #28a745;
-            color: white;
-        }
-        .method.get {
-            background-color: #007bff;
-            color: white;
-        }
-        .back-link {
-            display: inline-block;
-            margin-bottom: 20px;
-            color: #17a2b8;
-            text-decoration: none;
-        }
-        .back-link:hover {
-            text-decoration: underline;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <a href="/" class="back-link">← Back to Home</a>
-        <h1>ItisPay API Documentation</h1>
-        <p>This documentation describes the endpoints available in the ItisPay Fraud Detection API.</p>
-        
-        <h2>Endpoints</h2>
-        
-        <div class="endpoint">
-            <h3><span class="method post">POST</span> /api/fraud-check</h3>
-            <p>Analyze a transaction for fraud risk.</p>
-            
-            <h4>Request Body:</h4>
-            <pre>
-{
-  "fiat": {
-    "amount": 1000,
-    "currency": "USD",
-    "card_country": "US",
-    "geo_ip": "NG"
-  },
-  "crypto": {
-    "address": "0x742d35Cc6634C0532925a3b844Bc454e4438f44e",
-    "currency": "ETH",
-    "amount": 0.5
-  }
-}
-            </pre>
-            
-            <h4>Response:</h4>
-            <pre>
-{
-  "risk_score": 75.5,
-  "risk_level": "High",
-  "alerts": [
-    "Card country (US) doesn't match IP location (NG)",
-    "Suspicious wallet patterns detected"
-  ],
-  "fiat_risk": {
-    "score": 65.3,
-    "alerts": [
-      "Card country (US) doesn't match IP location (NG)"
-    ]
-  },
-  "crypto_risk": {
-    "score": 85.7,
-    "alerts": [
-      "Suspicious wallet patterns detected"
-    ]
-  },
-  "processing_time": 0.254
-}
-            </pre>
-        </div>
-        
-        <div class="endpoint">
-            <h3><span class="method get">GET</span> /api/transactions</h3>
-            <p>Get transaction history with optional filtering.</p>
-            
-            <h4>Query Parameters:</h4>
-            <ul>
-                <li><code>limit</code> - Maximum number of transactions to return (default: 20)</li>
-                <li><code>offset</code> - Number of transactions to skip (default: 0)</li>
-                <li><code>min_risk</code> - Minimum risk score filter (optional)</li>
-                <li><code>max_risk</code> - Maximum risk score filter (optional)</li>
-                <li><code>transaction_type</code> - Filter by transaction type: fiat, crypto, or both (optional)</li>
-            </ul>
-            
-            <h4>Response:</h4>
-            <pre>
-{
-  "transactions": [
-    {
-      "id": 1,
-      "transaction_type": "both",
-      "amount": 1000,
-      "currency": "USD",
-      "timestamp": "2025-04-17T15:30:45.123Z",
-      "risk_score": 75.5,
-      "risk_level": "High"
-    },
-    {
-      "id": 2,
-      "transaction_type": "crypto",
-      "amount": 0.5,
-      "currency": "ETH",
-      "timestamp": "2025-04-17T14:22:31.456Z",
-      "risk_score": 35.2,
-      "risk_level": "Medium"
-    }
-  ],
-  "total": 2
-}
-            </pre>
-        </div>
-        
-        <h2>Testing the API</h2>
-        <p>You can test the API directly using these endpoints:</p>
-        <ul>
-            <li>Use <code>/api/fraud-check</code> to analyze a transaction</li>
-            <li>Use <code>/api/transactions</code> to retrieve transaction history</li>
-        </ul>
-    </div>
-</body>
-</html>
-"""
+# Blocks whose whitespace is significant and must survive minification
+_PRESERVED_BLOCK_RE = re.compile(rb'(<(pre|textarea)\b.*?</\2>)', re.S | re.I)
+_HTML_COMMENT_RE = re.compile(rb'<!--.*?-->', re.S)
+_INDENT_RE = re.compile(rb'\n\s+')
+
+def _minify_html(html):
+    """
+    Drop HTML comments, indentation and blank lines outside <pre> and <textarea>
+    
+    Line breaks are kept so inline scripts still parse the same way.
+    
+    Args:
+        html: Page source as bytes
+    
+    Returns:
+        bytes: Minified page
+    """
+    parts = _PRESERVED_BLOCK_RE.split(html)
+    # split() returns text, then each preserved block followed by its tag name
+    for i in range(0, len(parts), 3):
+        parts[i] = _INDENT_RE.sub(b'\n', _HTML_COMMENT_RE.sub(b'', parts[i]))
+    del parts[2::3]
+    return b''.join(parts).strip()
+
+# None of the page templates have variables, so read and minify them once, keeping
+# a gzip copy for clients that accept it and an ETag for each. make_static.py writes
+# the same pages to dist/ for a reverse proxy to serve.
+def _read_page(template_name):
+    with app.open_resource(f'templates/{template_name}') as f:
+        body = _minify_html(f.read())
+    etag = hashlib.md5(body).hexdigest()
+    # The gzip copy is a different representation, so it gets its own tag
+    return body, gzip.compress(body, compresslevel=9), etag, f'{etag}-gzip'
+
+LANDING_PAGE = _read_page('landing.html')
+API_DOCS_PAGE = _read_page('api_docs.html')
+FRAUD_CHECK_PAGE = _read_page('fraud_check.html')
+TRANSACTION_HISTORY_PAGE = _read_page('transaction_history.html')
+STATIC_PAGE_HEADERS = {'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+
+def _static_page_response(page):
+    """
+    Build the response for a static page, sending the gzip copy if the client accepts it
+    
+    Args:
+        page: Tuple of (HTML, gzip-compressed HTML, ETag, gzip ETag) from _read_page
+    
+    Returns:
+        Response: HTML response with caching headers, or 304 if the client's copy is current
+    """
+    body, body_gz, etag, etag_gz = page
+    use_gzip = bool(request.accept_encodings['gzip'])
+    if use_gzip:
+        body, etag = body_gz, etag_gz
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=STATIC_PAGE_HEADERS)
+    else:
+        response = Response(body, mimetype='text/html', headers=STATIC_PAGE_HEADERS)
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    return response
 
 # Routes
 @app.route('/')
 def index():
     """Landing page with links to features"""
-    logger.info("Landing page accessed")
-    return render_template_string(LANDING_PAGE_HTML)
+    logger.debug("Landing page accessed")
+    return _static_page_response(LANDING_PAGE)
 
 @app.route('/api-docs')
 def api_docs():
     """API documentation page"""
-    logger.info("API docs page accessed")
-    return render_template_string(API_DOCS_HTML)
+    logger.debug("API docs page accessed")
+    return _static_page_response(API_DOCS_PAGE)
 
 @app.route('/fraud-check')
 def fraud_check_page():
-    """Fraud detection form page"""
-    logger.info("Fraud check page accessed")
-    
-    # Generate a sample transaction
-    sample = generate_sample_transaction()
-    sample_json = json.dumps(sample, indent=2)
-    
-    return render_template_string('''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ItisPay Fraud Check</title>
-    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
-    <style>
-        body {
-            padding: 20px;
-            background-color: #1e1e1e;
-            color: #f0f0f0;
-            font-family: Arial, sans-serif;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-        }
-        .card {
-            background-color: #252525;
-            padding: 20px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-        .form-group {
-            margin-bottom: 15px;
-        }
-        textarea {
-            width: 100%;
-            height: 300px;
-            background-color: #333;
-            color: #f0f0f0;
-            border: 1px solid #444;
-            border-radius: 4px;
-            padding: 10px;
-            font-family: monospace;
-        }
-        .back-link {
-            display: inline-block;
-            margin-bottom: 20px;
-            color: #17a2b8;
-            text-decoration: none;
-        }
-        .back-link:hover {
-            text-decoration: underline;
-        }
-        .btn-primary {
-            background-color: #007bff;
-            border: none;
-            padding: 10px 20px;
-            color: white;
-            border-radius: 4px;
-            cursor: pointer;
-        }
-        .btn-primary:hover {
-            background-color: #0069d9;
-        }
-        .result-box {
-            background-color: #333;
-            padding: 15px;
-            border-radius: 5px;
-            margin-top: 20px;
-            white-space: pre-wrap;
-            font-family: monospace;
-        }
-        .risk-low {
-            color: #28a745;
-            font-weight: bold;
-        }
-        .risk-medium {
-            color: #ffc107;
-            font-weight: bold;
-        }
-        .risk-high {
-            color: #fd7e14;
-            font-weight: bold;
-        }
-        .risk-critical {
-            color: #dc3545;
-            font-weight: bold;
-        }
-        .alert-item {
-            margin: 5px 0;
-            padding-left: 20px;
-            position: relative;
-        }
-        .alert-item:before {
-            content: "⚠️";
-            position: absolute;
-            left: 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <a href="/" class="back-link">← Back to Home</a>
-        <h1>Fraud Detection</h1>
-        <p>Submit a transaction for analysis. You can edit the JSON below or use the sample provided.</p>
-        
-        <div class="card">
-            <form id="fraud-check-form">
-                <div class="form-group">
-                    <label for="transaction-json">Transaction JSON:</label>
-                    <textarea id="transaction-json" name="transaction_json">{{ sample_json }}</textarea>
-                </div>
-                <button type="submit" class="btn-primary">Analyze Transaction</button>
-            </form>
-        </div>
-        
-        <div id="results" style="display: none;">
-            <h2>Analysis Results:</h2>
-            <div class="card" id="result-content">
-                <div id="risk-score"></div>
-                <div id="alerts"></div>
-                <h4>Details:</h4>
-                <div class="result-box" id="result-json"></div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        document.getElementById('fraud-check-form').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const transactionJson = document.getElementById('transaction-json').value;
-            let transaction;
-            
-            try {
-                transaction = JSON.parse(transactionJson);
-            } catch (error) {
-                alert('Invalid JSON: ' + error.message);
-                return;
-            }
-            
-            // Show loading state
-            document.getElementById('results').style.display = 'block';
-            document.getElementById('result-content').innerHTML = '<p>Analyzing transaction...</p>';
-            
-            try {
-                const response = await fetch('/api/fraud-check', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: transactionJson
-                });
-                
-                if (!response.ok) {
-                    throw new Error('Error: ' + response.status);
-                }
-                
-                const result = await response.json();
-                
-                // Check if there's an error in the response
-                if (result.error) {
-                    document.getElementById('result-content').innerHTML = `
-                        <div class="alert alert-danger">
-                            <h4>Error:</h4>
-                            <p>${result.error}</p>
-                            <p>${result.message || ''}</p>
-                        </div>
-                    `;
-                    return;
-                }
-                
-                // Format the risk level with color
-                let riskClass = '';
-                if (result.risk_level === 'Low') {
-                    riskClass = 'risk-low';
-                } else if (result.risk_level === 'Medium') {
-                    riskClass = 'risk-medium';
-                } else if (result.risk_level === 'High') {
-                    riskClass = 'risk-high';
-                } else if (result.risk_level === 'Critical') {
-                    riskClass = 'risk-critical';
-                }
-                
-                // Format alerts
-                let alertsHtml = '<h4>Alerts:</h4>';
-                if (result.alerts && result.alerts.length > 0) {
-                    alertsHtml += '<ul>';
-                    result.alerts.forEach(alert => {
-                        alertsHtml += `<li class="alert-item">${alert}</li>`;
-                    });
-                    alertsHtml += '</ul>';
-                } else {
-                    alertsHtml += '<p>No alerts detected.</p>';
-                }
-                
-                // Determine which risk components are present
-                let riskDetails = '<div class="risk-components">';
-                
-                // Fiat risk
-                if (result.fiat_risk) {
-                    riskDetails += `
-                        <div class="risk-component">
-                            <h5>Fiat Risk: ${result.fiat_risk.score.toFixed(1)}</h5>
-                            ${result.fiat_risk.alerts && result.fiat_risk.alerts.length > 0 ? 
-                                '<ul>' + result.fiat_risk.alerts.map(alert => `<li>${alert}</li>`).join('') + '</ul>' : 
-                                '<p>No specific fiat risks detected.</p>'}
-                        </div>
-                    `;
-                }
-                
-                // Crypto risk
-                if (result.crypto_risk) {
-                    riskDetails += `
-                        <div class="risk-component">
-                            <h5>Crypto Risk: ${result.crypto_risk.score.toFixed(1)}</h5>
-                            ${result.crypto_risk.alerts && result.crypto_risk.alerts.length > 0 ? 
-                                '<ul>' + result.crypto_risk.alerts.map(alert => `<li>${alert}</li>`).join('') + '</ul>' : 
-                                '<p>No specific crypto risks detected.</p>'}
-                        </div>
-                    `;
-                }
-                
-                // USDC risk is now part of the crypto risk analysis
-                
-                riskDetails += '</div>';
-                
-                // Rebuild the entire result content
-                document.getElementById('result-content').innerHTML = `
-                    <h3>Risk Score: <span class="${riskClass}">${result.risk_score.toFixed(1)} (${result.risk_level})</span></h3>
-                    <div>${alertsHtml}</div>
-                    <h4>Risk Components:</h4>
-                    ${riskDetails}
-                    <h4>Full Details:</h4>
-                    <div class="result-box">${JSON.stringify(result, null, 2)}</div>
-                `;
-                
-            } catch (error) {
-                document.getElementById('result-content').innerHTML = '<p>Error: ' + error.message + '</p>';
-            }
-        });
-    </script>
-</body>
-</html>
-    ''', sample_json=sample_json)
+    """Fraud detection form page; the sample transaction comes from /api/sample-transaction"""
+    logger.debug("Fraud check page accessed")
+    return _static_page_response(FRAUD_CHECK_PAGE)
 
 @app.route('/transaction-history')
 def transaction_history_page():
     """Transaction history page"""
-    logger.info("Transaction history page accessed")
+    logger.debug("Transaction history page accessed")
+    return _static_page_response(TRANSACTION_HISTORY_PAGE)
+
+# Pages make_static.py pre-renders, mapped to their output file names
+STATIC_ROUTES = {
+    '/': 'index.html',
+    '/api-docs': 'api-docs.html',
+    '/fraud-check': 'fraud-check.html',
+    '/transaction-history': 'transaction-history.html',
+}
+
+@lru_cache(maxsize=1)
+def _sample_transaction_json(interval: int) -> bytes:
+    """
+    Generate the sample transaction shown on the fraud check form
     
-    return render_template_string('''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ItisPay Transaction History</title>
-    <link href="https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css" rel="stylesheet">
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {
-            padding: 20px;
-            background-color: #1e1e1e;
-            color: #f0f0f0;
-            font-family: Arial, sans-serif;
-        }
-        .container {
-            max-width: 1000px;
-            margin: 0 auto;
-        }
-        .card {
-            background-color: #252525;
-            padding: 20px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }
-        .back-link {
-            display: inline-block;
-            margin-bottom: 20px;
-            color: #17a2b8;
-            text-decoration: none;
-        }
-        .back-link:hover {
-            text-decoration: underline;
-        }
-        .filters {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin-bottom: 20px;
-        }
-        .filter-group {
-            display: flex;
-            flex-direction: column;
-            min-width: 150px;
-        }
-        label {
-            margin-bottom: 5px;
-        }
-        select, input {
-            padding: 8px;
-            background-color: #333;
-            color: #f0f0f0;
-            border: 1px solid #444;
-            border-radius: 4px;
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        th, td {
-            padding: 10px;
-            text-align: left;
-            border-bottom: 1px solid #444;
-        }
-        th {
-            background-color: #333;
-        }
-        .risk-low {
-            background-color: rgba(40, 167, 69, 0.3);
-            color: #28a745;
-            padding: 3px 8px;
-            border-radius: 3px;
-        }
-        .risk-medium {
-            background-color: rgba(255, 193, 7, 0.3);
-            color: #ffc107;
-            padding: 3px 8px;
-            border-radius: 3px;
-        }
-        .risk-high {
-            background-color: rgba(253, 126, 20, 0.3);
-            color: #fd7e14;
-            padding: 3px 8px;
-            border-radius: 3px;
-        }
-        .risk-critical {
-            background-color: rgba(220, 53, 69, 0.3);
-            color: #dc3545;
-            padding: 3px 8px;
-            border-radius: 3px;
-        }
-        .pagination {
-            display: flex;
-            justify-content: center;
-            margin-top: 20px;
-        }
-        .pagination button {
-            background-color: #333;
-            border: none;
-            color: #f0f0f0;
-            padding: 8px 12px;
-            margin: 0 5px;
-            cursor: pointer;
-            border-radius: 4px;
-        }
-        .pagination button:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-        .pagination span {
-            padding: 8px 12px;
-        }
-        #chart {
-            width: 100%;
-            height: 300px;
-        }
-        .empty-state {
-            padding: 30px;
-            text-align: center;
-            color: #888;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <a href="/" class="back-link">← Back to Home</a>
-        <h1>Transaction History</h1>
-        
-        <div class="card">
-            <h3>Filters</h3>
-            <div class="filters">
-                <div class="filter-group">
-                    <label for="type-filter">Transaction Type:</label>
-                    <select id="type-filter">
-                        <option value="">All Types</option>
-                        <option value="fiat">Fiat Only</option>
-                        <option value="crypto">Crypto Only</option>
-                        <option value="both">Combined</option>
-                    </select>
-                </div>
-                <div class="filter-group">
-                    <label for="min-risk">Min Risk Score:</label>
-                    <input type="range" id="min-risk" min="0" max="100" value="0" oninput="document.getElementById('min-risk-value').textContent = this.value">
-                    <span id="min-risk-value">0</span>
-                </div>
-                <div class="filter-group">
-                    <label for="max-risk">Max Risk Score:</label>
-                    <input type="range" id="max-risk" min="0" max="100" value="100" oninput="document.getElementById('max-risk-value').textContent = this.value">
-                    <span id="max-risk-value">100</span>
-                </div>
-                <div class="filter-group">
-                    <label for="limit">Items per page:</label>
-                    <select id="limit">
-                        <option value="10">10</option>
-                        <option value="20" selected>20</option>
-                        <option value="50">50</option>
-                        <option value="100">100</option>
-                    </select>
-                </div>
-                <div class="filter-group" style="justify-content: flex-end;">
-                    <button onclick="applyFilters()" style="margin-top: 20px; padding: 8px 15px; background-color: #007bff; color: white; border: none; border-radius: 4px; cursor: pointer;">Apply Filters</button>
-                </div>
-            </div>
-        </div>
-        
-        <div class="card">
-            <h3>Risk Distribution</h3>
-            <div id="chart"></div>
-        </div>
-        
-        <div class="card">
-            <h3>Transactions</h3>
-            <div id="transactions-table">
-                <div class="empty-state">Loading transactions...</div>
-            </div>
-            
-            <div class="pagination">
-                <button id="prev-page" onclick="changePage(-1)" disabled>Previous</button>
-                <span id="page-info">Page 1</span>
-                <button id="next-page" onclick="changePage(1)" disabled>Next</button>
-            </div>
-        </div>
-    </div>
+    Args:
+        interval: Current refresh interval number; a new sample is generated when it changes
     
-    <script>
-        let currentPage = 1;
-        let totalItems = 0;
-        let itemsPerPage = 20;
-        
-        async function fetchTransactions() {
-            const typeFilter = document.getElementById('type-filter').value;
-            const minRisk = document.getElementById('min-risk').value;
-            const maxRisk = document.getElementById('max-risk').value;
-            itemsPerPage = parseInt(document.getElementById('limit').value);
-            
-            const offset = (currentPage - 1) * itemsPerPage;
-            
-            let url = `/api/transactions?limit=${itemsPerPage}&offset=${offset}`;
-            
-            if (typeFilter) {
-                url += `&transaction_type=${typeFilter}`;
-            }
-            
-            if (minRisk > 0) {
-                url += `&min_risk=${minRisk}`;
-            }
-            
-            if (maxRisk < 100) {
-                url += `&max_risk=${maxRisk}`;
-            }
-            
-            try {
-                const response = await fetch(url);
-                
-                if (!response.ok) {
-                    throw new Error('Error: ' + response.status);
-                }
-                
-                const data = await response.json();
-                
-                // Update pagination
-                totalItems = data.total;
-                updatePagination();
-                
-                // Update table
-                updateTransactionsTable(data.transactions);
-                
-                // Update chart
-                updateRiskChart(data.transactions);
-                
-            } catch (error) {
-                document.getElementById('transactions-table').innerHTML = `<div class="empty-state">Error loading transactions: ${error.message}</div>`;
-            }
-        }
-        
-        function updateTransactionsTable(transactions) {
-            const tableContainer = document.getElementById('transactions-table');
-            
-            if (!transactions || transactions.length === 0) {
-                tableContainer.innerHTML = '<div class="empty-state">No transactions found matching your filters.</div>';
-                return;
-            }
-            
-            let tableHtml = `
-                <table>
-                    <thead>
-                        <tr>
-                            <th>ID</th>
-                            <th>Type</th>
-                            <th>Amount</th>
-                            <th>Date & Time</th>
-                            <th>Risk Score</th>
-                            <th>Risk Level</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-            
-            transactions.forEach(tx => {
-                const date = new Date(tx.timestamp).toLocaleString();
-                let riskClass = '';
-                
-                if (tx.risk_level === 'Low') {
-                    riskClass = 'risk-low';
-                } else if (tx.risk_level === 'Medium') {
-                    riskClass = 'risk-medium';
-                } else if (tx.risk_level === 'High') {
-                    riskClass = 'risk-high';
-                } else if (tx.risk_level === 'Critical') {
-                    riskClass = 'risk-critical';
-                }
-                
-                tableHtml += `
-                    <tr>
-                        <td>${tx.id}</td>
-                        <td>${tx.transaction_type}</td>
-                        <td>${tx.amount} ${tx.currency}</td>
-                        <td>${date}</td>
-                        <td>${tx.risk_score.toFixed(1)}</td>
-                        <td><span class="${riskClass}">${tx.risk_level}</span></td>
-                    </tr>
-                `;
-            });
-            
-            tableHtml += `
-                    </tbody>
-                </table>
-            `;
-            
-            tableContainer.innerHTML = tableHtml;
-        }
-        
-        function updateRiskChart(transactions) {
-            if (!transactions || transactions.length === 0) {
-                document.getElementById('chart').innerHTML = '<div class="empty-state">No data to display.</div>';
-                return;
-            }
-            
-            // Count risk levels
-            const riskCounts = {
-                'Low': 0,
-                'Medium': 0,
-                'High': 0,
-                'Critical': 0
-            };
-            
-            transactions.forEach(tx => {
-                if (tx.risk_level in riskCounts) {
-                    riskCounts[tx.risk_level]++;
-                }
-            });
-            
-            // Create chart data
-            const data = [{
-                x: Object.keys(riskCounts),
-                y: Object.values(riskCounts),
-                type: 'bar',
-                marker: {
-                    color: ['#28a745', '#ffc107', '#fd7e14', '#dc3545']
-                }
-            }];
-            
-            const layout = {
-                title: 'Risk Level Distribution',
-                paper_bgcolor: 'rgba(0,0,0,0)',
-                plot_bgcolor: 'rgba(0,0,0,0)',
-                font: {
-                    color: '#f0f0f0'
-                },
-                xaxis: {
-                    title: 'Risk Level'
-                },
-                yaxis: {
-                    title: 'Count'
-                }
-            };
-            
-            Plotly.newPlot('chart', data, layout);
-        }
-        
-        function updatePagination() {
-            const totalPages = Math.ceil(totalItems / itemsPerPage);
-            
-            document.getElementById('page-info').textContent = `Page ${currentPage} of ${totalPages || 1}`;
-            document.getElementById('prev-page').disabled = currentPage <= 1;
-            document.getElementById('next-page').disabled = currentPage >= totalPages;
-        }
-        
-        function changePage(change) {
-            currentPage += change;
-            fetchTransactions();
-        }
-        
-        function applyFilters() {
-            currentPage = 1;
-            fetchTransactions();
-        }
-        
-        // Initial load
-        fetchTransactions();
-    </script>
-</body>
-</html>
-    ''')
+    Returns:
+        bytes: JSON for the sample transaction
+    """
+    return orjson.dumps(generate_sample_transaction(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+# Fraud checks waiting to be committed by this process's writer thread
+_write_queue = queue.Queue(maxsize=DB_WRITE_QUEUE_SIZE)
+_writer_thread = None
+_writer_lock = threading.Lock()
+
+def _next_write_batch():
+    """
+    Wait for the next queued analysis, then keep collecting until DB_WRITE_BATCH_SIZE
+    analyses are queued or DB_WRITE_BATCH_INTERVAL seconds have passed
+    
+    Returns:
+        Tuple[list, bool]: (transaction data, results) pairs, and whether a None item asked the writer to stop
+    """
+    item = _write_queue.get()
+    if item is None:
+        return [], True
+    
+    batch = [item]
+    deadline = time.monotonic() + DB_WRITE_BATCH_INTERVAL
+    while len(batch) < DB_WRITE_BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            item = _write_queue.get(timeout=timeout)
+        except queue.Empty:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+def _db_writer():
+    """Commit queued analyses in batches until asked to stop"""
+    while True:
+        batch, stopping = _next_write_batch()
+        if batch:
+            try:
+                with app.app_context():
+                    save_transactions(batch)
+            except Exception as e:
+                logger.error("Database writer failed to save batch: %s", e)
+        if stopping:
+            return
+
+def _stop_db_writer():
+    """Flush the write queue on shutdown"""
+    if _writer_thread is not None and _writer_thread.is_alive():
+        _write_queue.put(None)
+        _writer_thread.join(timeout=5)
+
+atexit.register(_stop_db_writer)
+
+def _queue_for_persistence(transaction_data, results):
+    """
+    Hand an analysis to the background writer without blocking the request
+    
+    Args:
+        transaction_data: Transaction as submitted to the API
+        results: Analysis results for the transaction
+    """
+    global _writer_thread
+    # Started on first use, so the preloaded Gunicorn master never owns the thread and each worker gets one
+    if _writer_thread is None or not _writer_thread.is_alive():
+        with _writer_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(target=_db_writer, name='db-writer', daemon=True)
+                _writer_thread.start()
+    
+    try:
+        _write_queue.put_nowait((transaction_data, results))
+    except queue.Full:
+        logger.warning("Database write queue is full, transaction not saved")
 
 # API endpoints
 @app.route('/api/fraud-check', methods=['POST'])
 def api_fraud_check():
     """Analyze a transaction for fraud risk"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         # Get transaction data from request
         transaction_data = request.json
-        logger.info(f"Received fraud check request: {transaction_data}")
+        logger.debug("Received fraud check request: %r", transaction_data)
         
         # Analyze the transaction
         results = risk_scorer.analyze_transaction(transaction_data)
         
         # Add processing time
-        results['processing_time'] = round(time.time() - start_time, 4)
-        
-        # Convert all numpy values to Python types
-        def convert_numpy_types(obj):
-            import numpy as np
-            if isinstance(obj, dict):
-                return {k: convert_numpy_types(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            elif isinstance(obj, np.number):  # Check for any numpy numeric type
-                return float(obj)
-            else:
-                return obj
-                
-        # Convert numpy types to Python types
-        results = convert_numpy_types(results)
+        results['processing_time'] = round(time.perf_counter() - start_time, 4)
         
-        # Print response status for debugging
-        print("Response Status: 200 OK")
-        print(f"Response Data: {results}")
+        logger.debug("Fraud check result: %r", results)
         
-        # Store in database
-        with app.app_context():
-            try:
-                # Already converted above, but keep this check for safety
-                if 'risk_score' in results and hasattr(results['risk_score'], 'item'):
-                    results['risk_score'] = float(results['risk_score'])
-                
-                # Create a transaction record from the API result
-                db_transaction = Transaction.from_api_result(transaction_data, results)
-                
-                # Add and commit to the database
-                db.session.add(db_transaction)
-                db.session.commit()
-                
-                logger.info(f"Transaction saved to database with ID: {db_transaction.id}")
-            except Exception as db_error:
-                logger.error(f"Failed to save transaction to database: {db_error}")
-                # Don't fail the API response if database save fails
-                db.session.rollback()
+        # Store in database without holding up the response
+        _queue_for_persistence(transaction_data, results)
         
+        # ORJSONProvider serializes any NumPy values left in the results
         return jsonify(results)
     
     except Exception as e:
-        logger.error(f"Error analyzing transaction: {e}")
+        logger.error("Error analyzing transaction: %s", e)
+        return jsonify({
+            "error": "Transaction analysis failed",
+            "message": str(e),
+            "processing_time": round(time.perf_counter() - start_time, 4)
+        }), 500
+
+def save_transactions(pairs):
+    """
+    Store analysed transactions with a single commit
+    
+    Args:
+        pairs: List of (transaction data, analysis results) pairs
+        
+    Returns:
+        int: Number of transactions saved
+    """
+    records = []
+    for transaction_data, results in pairs:
+        try:
+            records.append(Transaction.from_api_result(transaction_data, results))
+        except Exception as record_error:
+            logger.error("Failed to build transaction record: %s", record_error)
+    
+    if not records:
+        return 0
+    
+    try:
+        # SQLAlchemy 2 flushes these as multi-row INSERT ... VALUES statements
+        db.session.add_all(records)
+        db.session.commit()
+    except Exception as db_error:
+        logger.error("Failed to save transactions to database: %s", db_error)
+        db.session.rollback()
+        return 0
+    
+    logger.info("Saved %d transactions to database", len(records))
+    return len(records)
+
+@app.route('/api/fraud-check/bulk', methods=['POST'])
+def api_fraud_check_bulk():
+    """Analyze a JSON array of transactions and store them in one batch"""
+    start_time = time.perf_counter()
+    transactions = request.json
+    
+    if not isinstance(transactions, list) or not transactions:
+        return jsonify({"error": "Expected a non-empty JSON array of transactions"}), 400
+    
+    if len(transactions) > BULK_MAX_TRANSACTIONS:
+        return jsonify({"error": f"At most {BULK_MAX_TRANSACTIONS} transactions can be checked per request"}), 413
+    
+    invalid = [i for i, t in enumerate(transactions) if not isinstance(t, dict) or not (t.get('fiat') or t.get('crypto'))]
+    if invalid:
+        return jsonify({
+            "error": "Each transaction needs a fiat or crypto component",
+            "invalid_indices": invalid
+        }), 400
+    
+    logger.info("Received bulk fraud check request for %d transactions", len(transactions))
+    
+    try:
+        # Fiat components are scored together in one model call
+        results = risk_scorer.analyze_batch(transactions)
+    except Exception as e:
+        logger.error("Error analyzing transactions: %s", e)
         return jsonify({
             "error": "Transaction analysis failed",
             "message": str(e),
-            "processing_time": round(time.time() - start_time, 4)
+            "processing_time": round(time.perf_counter() - start_time, 4)
         }), 500
+    
+    saved = save_transactions(list(zip(transactions, results)))
+    
+    return jsonify({
+        "results": results,
+        "saved": saved,
+        "processing_time": round(time.perf_counter() - start_time, 4)
+    })
+
+@app.route('/api/sample-transaction')
+def api_sample_transaction():
+    """Sample transaction used to pre-fill the fraud check form"""
+    # Reuse the sample transaction for SAMPLE_REFRESH_INTERVAL seconds
+    sample_json = _sample_transaction_json(int(time.time() // SAMPLE_REFRESH_INTERVAL))
+    return Response(sample_json, mimetype='application/json',
+                    headers={'Cache-Control': f'public, max-age={SAMPLE_REFRESH_INTERVAL}'})
+
+def _filtered_transactions_query():
+    """
+    Build a transaction query from the history filters in the request arguments
+    
+    Returns:
+        Query: Transactions matching min_risk, max_risk and transaction_type
+    """
+    min_risk = request.args.get('min_risk', type=float)
+    max_risk = request.args.get('max_risk', type=float)
+    transaction_type = request.args.get('transaction_type')
+    
+    logger.debug("Getting transaction history with filters: min_risk=%s, max_risk=%s, type=%s",
+                 min_risk, max_risk, transaction_type)
+    
+    # Build the query
+    query = db.session.query(Transaction)
+    
+    # Apply filters
+    if min_risk is not None:
+        query = query.filter(Transaction.risk_score >= min_risk)
+    
+    if max_risk is not None:
+        query = query.filter(Transaction.risk_score <= max_risk)
+    
+    if transaction_type:
+        query = query.filter(Transaction.transaction_type == transaction_type)
+    
+    return query
 
 @app.route('/api/transactions')
 def api_transactions():
     """Get transaction history with optional filtering"""
     limit = request.args.get('limit', 20, type=int)
     offset = request.args.get('offset', 0, type=int)
-    min_risk = request.args.get('min_risk', type=float)
-    max_risk = request.args.get('max_risk', type=float)
-    transaction_type = request.args.get('transaction_type')
-    
-    logger.info(f"Getting transaction history with filters: min_risk={min_risk}, max_risk={max_risk}, type={transaction_type}")
     
     try:
         with app.app_context():
-            # Build the query
-            query = db.session.query(Transaction)
-            
-            # Apply filters
-            if min_risk is not None:
-                query = query.filter(Transaction.risk_score >= min_risk)
-            
-            if max_risk is not None:
-                query = query.filter(Transaction.risk_score <= max_risk)
-            
-            if transaction_type:
-                query = query.filter(Transaction.transaction_type == transaction_type)
-            
-            # Get total count for pagination
-            total_count = query.count()
-            
-            # Apply pagination and get results
-            transactions = query.order_by(Transaction.timestamp.desc()).offset(offset).limit(limit).all()
+            query = _filtered_transactions_query()
+            
+            # Fetch the page and the total matching count in one query with a window function
+            rows = query.with_entities(
+                Transaction.id,
+                Transaction.transaction_type,
+                Transaction.amount,
+                Transaction.currency,
+                Transaction.timestamp,
+                Transaction.risk_score,
+                Transaction.risk_level_code,
+                func.count().over().label('total')
+            ).order_by(Transaction.timestamp.desc()).offset(offset).limit(limit).all()
+            
+            if rows:
+                total_count = rows[0].total
+            else:
+                # The window count is only available on returned rows, e.g. not past the last page
+                total_count = query.count() if offset else 0
             
             # Convert to dictionaries for JSON serialization
             result = []
-            for tx in transactions:
+            for tx in rows:
                 result.append({
                     "id": tx.id,
                     "transaction_type": tx.transaction_type,
@@ -1138,12 +525,10 @@ def api_transactions():
                     "currency": tx.currency,
                     "timestamp": tx.timestamp.isoformat() if tx.timestamp else None,
                     "risk_score": tx.risk_score,
-                    "risk_level": tx.risk_level
+                    "risk_level": RISK_LEVELS[tx.risk_level_code] if tx.risk_level_code is not None else None
                 })
             
-            # Print response status for debugging
-            print("Response Status: 200 OK")
-            print(f"Response Data: {{'transactions': {len(result)}, 'total': {total_count}}}")
+            logger.debug("Returning %d of %d transactions", len(result), total_count)
             
             return jsonify({
                 "transactions": result,
@@ -1151,11 +536,32 @@ def api_transactions():
             })
             
     except Exception as e:
-        logger.error(f"Error fetching transactions: {e}")
+        logger.error("Error fetching transactions: %s", e)
         return jsonify({
             "error": "Failed to fetch transactions",
             "message": str(e)
         }), 500
 
+@app.route('/api/transactions/risk-histogram')
+def api_risk_histogram():
+    """Count all transactions matching the history filters per risk level"""
+    try:
+        with app.app_context():
+            counts = dict(
+                _filtered_transactions_query()
+                .with_entities(Transaction.risk_level_code, func.count())
+                .group_by(Transaction.risk_level_code)
+                .all()
+            )
+        
+        return jsonify({level: counts.get(code, 0) for code, level in enumerate(RISK_LEVELS)})
+    
+    except Exception as e:
+        logger.error("Error counting transactions by risk level: %s", e)
+        return jsonify({
+            "error": "Failed to count transactions",
+            "message": str(e)
+        }), 500
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -6,7 +6,10 @@ and a Streamlit UI for demonstration and interaction.
 
 import os
 import sys
+import atexit
+import signal
 import logging
+import subprocess
 import uvicorn
 import multiprocessing
 import time
@@ -26,10 +29,27 @@ def start_fastapi():
     from api import app
     uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
 
-def start_streamlit():
-    """Start the Streamlit UI on port 8501"""
+def start_streamlit() -> subprocess.Popen:
+    """
+    Start the Streamlit UI on port 8501
+    
+    Returns:
+        subprocess.Popen: The Streamlit process, started directly rather than through a shell
+    """
     logger.info("Starting Streamlit UI on port 8501...")
-    os.system(f"{sys.executable} -m streamlit run ui.py --server.port=8501 --server.address=0.0.0.0 --server.headless=true")
+    return subprocess.Popen([
+        sys.executable, "-m", "streamlit", "run", "ui.py",
+        "--server.port=8501", "--server.address=0.0.0.0", "--server.headless=true"
+    ])
+
+def _stop_children(*processes):
+    """Terminate child processes that are still running"""
+    for process in processes:
+        if isinstance(process, Process):
+            if process.is_alive():
+                process.terminate()
+        elif process.poll() is None:
+            process.terminate()
 
 def main():
     """
@@ -47,8 +67,12 @@ def main():
     # Allow API to start up
     time.sleep(2)
     
-    # Start Streamlit in the main process
-    start_streamlit()
+    # Start Streamlit and wait on it, stopping both children when this process exits
+    streamlit_process = start_streamlit()
+    atexit.register(_stop_children, streamlit_process, api_process)
+    # Turn SIGTERM into a normal exit so the atexit hook runs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    streamlit_process.wait()
 
 if __name__ == "__main__":
     logger.info("Starting ItisPay Fraud Detection combined application...")
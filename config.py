@@ -15,12 +15,45 @@ HIGH_RISK_THRESHOLD = 90
 # Anomaly Detection Parameters
 ISOLATION_FOREST_CONTAMINATION = 0.05  # Expected proportion of outliers
 ISOLATION_FOREST_RANDOM_STATE = 42  # For reproducibility
+MODEL_PATH = os.getenv("MODEL_PATH", "model.pkl")  # Trained models are cached here between restarts
 
 # API Request Rate Limits (requests per second)
 ETHERSCAN_RATE_LIMIT = 5
+ETHERSCAN_FETCH_THREADS = 4  # Threads fetching internal transactions alongside the main Etherscan request
+ADDRESS_CACHE_SIZE = 10000  # Maximum number of addresses whose Etherscan history is kept in memory
+ADDRESS_CACHE_TTL = 3600  # Seconds before a cached address history is fetched again
+ETHERSCAN_POOL_SIZE = 20  # Keep-alive connections to Etherscan per process
+ETHERSCAN_RETRIES = 3  # Retries, with backoff, for failed connections and 429/5xx responses
+ETHERSCAN_TIMEOUT = (3, 10)  # Connect and read timeouts in seconds for Etherscan requests
 
 # Performance Configuration
 PROCESSING_TIMEOUT = 1.0  # Maximum transaction processing time in seconds
+SLOW_REQUEST_THRESHOLD = 0.5  # Requests slower than this many seconds are logged as warnings
+PREDICTION_CACHE_SIZE = 10000  # Maximum number of memoized risk analyses kept per process
+PREDICTION_CACHE_TTL = 300  # Seconds a memoized analysis is reused; keep below ADDRESS_CACHE_TTL so crypto scores see refreshed histories
+API_WORKERS = int(os.getenv("API_WORKERS", 2 * (os.cpu_count() or 1) + 1))  # Uvicorn worker processes for api_server.py
+WORKER_THREAD_LIMIT = 100  # Maximum number of threads running blocking work for the API
+VALIDATION_CACHE_SIZE = 65536  # Maximum number of memoized IP and address validation results
+SCORING_BATCH_SIZE = 32  # Maximum number of concurrent requests scored together
+SCORING_BATCH_DELAY = 0.005  # Maximum time in seconds to wait for a scoring batch to fill
+
+STATIC_ASSET_MAX_AGE = 31536000  # Browser cache lifetime in seconds for /static files; bump the ?v= query when they change
+# Database Settings
+ENABLE_DB = os.getenv("ENABLE_DB", "1") == "1"  # Set ENABLE_DB=0 to run the API without storing transactions
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///fraud_detection.db")
+DB_POOL_SIZE = 40  # Persistent connections per process, enough for the request threadpool
+DB_MAX_OVERFLOW = 20  # Extra connections allowed during bursts
+DB_POOL_RECYCLE = 1800  # Reconnect pooled connections older than this many seconds
+DB_ASYNC_COMMIT = os.getenv("DB_ASYNC_COMMIT", "0") == "1"  # PostgreSQL only: commit without waiting for the WAL flush
+
+# Database Write Settings
+DB_WRITE_QUEUE_SIZE = 10000  # Maximum number of analyses waiting to be persisted
+DB_WRITE_BATCH_SIZE = 100  # Maximum number of transactions committed together
+DB_WRITE_BATCH_INTERVAL = 0.2  # Maximum time in seconds to wait for a batch to fill
+BULK_MAX_TRANSACTIONS = 1000  # Maximum number of transactions accepted by /api/fraud-check/bulk
 
 # Data Generation Settings
 SYNTHETIC_DATA_SIZE = 1000  # Number of synthetic transactions to generate
+SAMPLE_BATCH_SIZE = 1024  # Sample transactions generated per NumPy batch and handed out one at a time
+PARALLEL_GENERATION_MIN_SAMPLES = 1_000_000  # Synthetic datasets at least this large are generated across CPU cores
+SAMPLE_REFRESH_INTERVAL = 60  # Seconds before the fraud check form shows a new sample transaction
@@ -1,34 +1,41 @@
-import requests
-import pandas as pd
+import orjson
+import numpy as np
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
 import logging
-from config import ETHERSCAN_API_KEY, ETHERSCAN_RATE_LIMIT
-from utils import is_valid_eth_address, normalize_score
+from cachetools import TTLCache
+from config import (
+    ETHERSCAN_API_KEY, ETHERSCAN_RATE_LIMIT, ETHERSCAN_FETCH_THREADS, ADDRESS_CACHE_SIZE, ADDRESS_CACHE_TTL,
+    ETHERSCAN_TIMEOUT
+)
+from utils import is_valid_eth_address, normalize_score, create_etherscan_session
 from risky_addresses import KNOWN_MIXER_ADDRESSES, KNOWN_DARKNET_ADDRESSES
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 class EtherscanRateLimiter:
-    """Class to handle rate limiting for Etherscan API"""
+    """Class to handle rate limiting for Etherscan API, shared safely between threads"""
     
     def __init__(self, requests_per_second: int = ETHERSCAN_RATE_LIMIT):
         self.requests_per_second = requests_per_second
-        self.last_request_time = 0
+        self.next_request_time = float('-inf')
+        self._lock = threading.Lock()
     
     def wait_if_needed(self):
         """Wait if necessary to respect the rate limit"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        # If less than the minimum interval has passed, wait
-        if time_since_last_request < (1.0 / self.requests_per_second):
-            wait_time = (1.0 / self.requests_per_second) - time_since_last_request
+        # Reserve the next free slot under the lock, then sleep outside it so
+        # concurrent callers queue up one interval apart
+        with self._lock:
+            current_time = time.perf_counter()
+            slot = max(current_time, self.next_request_time)
+            self.next_request_time = slot + 1.0 / self.requests_per_second
+        
+        wait_time = slot - current_time
+        if wait_time > 0:
             time.sleep(wait_time)
-        
-        # Update the last request time
-        self.last_request_time = time.time()
 
 class CryptoTransactionAnalyzer:
     """
@@ -46,8 +53,15 @@ class CryptoTransactionAnalyzer:
         self.base_url = "https://api.etherscan.io/api"
         self.rate_limiter = EtherscanRateLimiter()
         
-        # Cache for previous address analyses to reduce API calls
-        self.address_cache = {}
+        # Keep-alive connections to Etherscan, and threads for requests made in parallel
+        self.session = create_etherscan_session()
+        self._executor = ThreadPoolExecutor(max_workers=ETHERSCAN_FETCH_THREADS,
+                                            thread_name_prefix='etherscan')
+        
+        # Cache for previous address analyses to reduce API calls; bounded, and
+        # entries expire so new on-chain activity is picked up
+        self.address_cache = TTLCache(maxsize=ADDRESS_CACHE_SIZE, ttl=ADDRESS_CACHE_TTL)
+        self._address_cache_lock = threading.Lock()
         
         logger.info("Crypto Transaction Analyzer initialized")
     
@@ -62,7 +76,7 @@ class CryptoTransactionAnalyzer:
         Returns:
             Tuple[float, List[str]]: Risk score (0-1) and list of alerts
         """
-        logger.info(f"Analyzing crypto transaction: {transaction}")
+        logger.debug("Analyzing crypto transaction: %r", transaction)
         
         # Initialize risks and alerts
         risk_score = 0.0
@@ -79,6 +93,11 @@ class CryptoTransactionAnalyzer:
             alerts.extend(address_alerts)
             risk_score = max(risk_score, address_risk)
         
+        # Nothing found on chain can raise a maximum score, so save the Etherscan round trips
+        if risk_score >= 1.0:
+            logger.info("Crypto analysis result: score=%s, alerts=%s", risk_score, alerts)
+            return risk_score, alerts
+        
         # Get transactions for this address
         transactions = self._get_address_transactions(transaction['address'], transaction['currency'])
         
@@ -105,7 +124,7 @@ class CryptoTransactionAnalyzer:
             # Assign moderate risk for no history
             risk_score = max(risk_score, 0.4)
         
-        logger.info(f"Crypto analysis result: score={risk_score}, alerts={alerts}")
+        logger.info("Crypto analysis result: score=%s, alerts=%s", risk_score, alerts)
         return risk_score, alerts
     
     def _validate_transaction(self, transaction: Dict[str, Any]) -> bool:
@@ -160,14 +179,15 @@ class CryptoTransactionAnalyzer:
         """
         risk_score = 0.0
         alerts = []
+        address_lower = address.lower()
         
         # Check for mixer addresses
-        if address.lower() in KNOWN_MIXER_ADDRESSES:
+        if address_lower in KNOWN_MIXER_ADDRESSES:
             risk_score = 0.9
             alerts.append(f"Address is a known mixer: {address}")
         
         # Check for darknet addresses
-        if address.lower() in KNOWN_DARKNET_ADDRESSES:
+        if address_lower in KNOWN_DARKNET_ADDRESSES:
             risk_score = 1.0
             alerts.append(f"Address is associated with darknet markets: {address}")
         
@@ -178,33 +198,27 @@ class CryptoTransactionAnalyzer:
         Get recent transactions for an address using Etherscan API
         
         Args:
-            address: Ethereum address
+            address: Ethereum address, already validated
             currency: Cryptocurrency (ETH, etc.)
             
         Returns:
             Optional[List[Dict[str, Any]]]: List of transactions or None if error
         """
         # Check cache first
-        if address in self.address_cache:
-            logger.info(f"Using cached transaction data for address: {address}")
-            return self.address_cache[address]
-        
-        # Handle different cryptocurrencies
+        with self._address_cache_lock:
+            cached = self.address_cache.get(address)
+        if cached is not None:
+            logger.info("Using cached transaction data for address: %s", address)
+            return cached
+        
+        # Non-ETH currencies are looked up by their Ethereum-compatible address,
+        # which _validate_transaction has already checked
         if currency != 'ETH':
             logger.info(f"Non-ETH currency detected: {currency}. Using compatible ETH address lookup.")
-            # For non-ETH currencies, we'll still check the address using Etherscan if it's a valid ETH address
-            # But we note that it's a different currency
-            if not is_valid_eth_address(address):
-                logger.warning(f"Invalid Ethereum address format for {currency} lookup: {address}")
-                return None
         
         try:
-            logger.info(f"Fetching transactions for address: {address}")
+            logger.info("Fetching transactions for address: %s", address)
             
-            # Respect rate limits
-            self.rate_limiter.wait_if_needed()
-            
-            # Query normal transactions
             params = {
                 'module': 'account',
                 'action': 'txlist',
@@ -215,36 +229,42 @@ class CryptoTransactionAnalyzer:
                 'apikey': self.api_key
             }
             
-            response = requests.get(self.base_url, params=params)
-            
-            if response.status_code != 200:
-                logger.error(f"API request failed with status code: {response.status_code}")
-                return None
-            
-            data = response.json()
-            
-            if data['status'] != '1':
-                logger.warning(f"API returned error: {data['message']}")
-                return None
-            
-            # Get internal transactions too
+            # Take the first rate limit slot for the normal query, then fetch internal
+            # transactions in the background while making it here
             self.rate_limiter.wait_if_needed()
+            skip_internal = threading.Event()
+            internal_future = self._executor.submit(self._fetch_transactions,
+                                                    {**params, 'action': 'txlistinternal'}, skip_internal)
+            try:
+                transactions = self._request_transactions(params)
+            except Exception as e:
+                # Treat it like a failed query so the internal one is dropped below
+                logger.error("Error fetching transactions: %s", e)
+                transactions = None
             
-            params['action'] = 'txlistinternal'
-            response_internal = requests.get(self.base_url, params=params)
+            if not transactions:
+                # A failed query or a fresh address leaves nothing to combine, so drop
+                # the internal query while it is still waiting for its rate limit slot
+                skip_internal.set()
+                internal_future.cancel()
+                if transactions is None:
+                    return None
+                with self._address_cache_lock:
+                    self.address_cache[address] = []
+                return []
             
-            if response_internal.status_code == 200:
-                data_internal = response_internal.json()
-                if data_internal['status'] == '1':
-                    # Combine both types of transactions
-                    all_transactions = data['result'] + data_internal['result']
-                else:
-                    all_transactions = data['result']
-            else:
-                all_transactions = data['result']
+            try:
+                internal_transactions = internal_future.result()
+            except Exception as e:
+                logger.warning("Error fetching internal transactions: %s", e)
+                internal_transactions = None
+            
+            # Combine both types of transactions
+            all_transactions = transactions + (internal_transactions or [])
             
             # Cache the results
-            self.address_cache[address] = all_transactions
+            with self._address_cache_lock:
+                self.address_cache[address] = all_transactions
             
             return all_transactions
             
@@ -252,6 +272,51 @@ class CryptoTransactionAnalyzer:
             logger.error(f"Error fetching transactions: {e}")
             return None
     
+    def _fetch_transactions(self, params: Dict[str, Any],
+                            skip: Optional[threading.Event] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wait for a rate limit slot, then make one Etherscan account query
+        
+        Args:
+            params: Query parameters, including the action
+            skip: Set by the caller once the result is no longer needed
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: The result list, or None if the request failed or was skipped
+        """
+        self.rate_limiter.wait_if_needed()
+        if skip is not None and skip.is_set():
+            return None
+        return self._request_transactions(params)
+    
+    def _request_transactions(self, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Make one Etherscan account query; the caller must respect the rate limit
+        
+        Args:
+            params: Query parameters, including the action
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: The result list, or None if the request failed
+        """
+        response = self.session.get(self.base_url, params=params, timeout=ETHERSCAN_TIMEOUT)
+        
+        if response.status_code != 200:
+            logger.error("API request failed with status code: %s", response.status_code)
+            return None
+        
+        # orjson parses the raw bytes without decoding them to a str first
+        data = orjson.loads(response.content)
+        
+        if data['status'] != '1':
+            # Etherscan reports an address without history as an error with an empty result
+            if data.get('result') == []:
+                return []
+            logger.warning("API returned error for %s: %s", params['action'], data['message'])
+            return None
+        
+        return data['result']
+    
     def _check_mixer_interaction(self, transactions: List[Dict[str, Any]]) -> Tuple[float, List[str]]:
         """
         Check if the address has interacted with known mixer addresses
@@ -268,57 +333,31 @@ class CryptoTransactionAnalyzer:
         if not transactions:
             return risk_score, alerts
         
-        # Count transactions with known mixers
-        mixer_transactions = 0
-        mixer_value = 0.0
-        total_value = 0.0
-        
-        for tx in transactions:
+        # Parse every value at once; Etherscan sends wei as decimal digit strings
+        raw_values = np.array([str(tx.get('value', '0')) for tx in transactions])
+        is_digits = np.char.isdigit(raw_values)
+        wei = np.zeros(len(transactions))
+        wei[is_digits] = raw_values[is_digits].astype(np.float64)
+        for i in np.flatnonzero(~is_digits):
             try:
-                # Get the counterparty address
-                counterparty = None
-                if 'from' in tx and tx['from'].lower() in KNOWN_MIXER_ADDRESSES:
-                    counterparty = tx['from'].lower()
-                elif 'to' in tx and tx['to'] and tx['to'].lower() in KNOWN_MIXER_ADDRESSES:
-                    counterparty = tx['to'].lower()
-                
-                # Calculate value - safely parse value to avoid integer overflow
-                try:
-                    raw_value = tx.get('value', '0')
-                    # Ensure we're dealing with a string to prevent integer overflow
-                    if not isinstance(raw_value, str):
-                        raw_value = str(raw_value)
-                    
-                    # Для очень больших чисел используем научную нотацию и округление
-                    if len(raw_value) > 15:
-                        # Форматируем в научную нотацию с 3 знаками после запятой
-                        sci_notation = '{:.3e}'.format(float(raw_value))
-                        parts = sci_notation.split('e')
-                        mantissa = float(parts[0])
-                        exponent = int(parts[1])
-                        # Учитываем деление на 1e18 (wei -> ETH) в экспоненте
-                        new_exponent = exponent - 18
-                        # Правильно рассчитываем значение с учетом экспоненты
-                        if new_exponent >= 0:
-                            value = mantissa * (10 ** new_exponent)
-                        else:
-                            value = mantissa / (10 ** abs(new_exponent))
-                        # Округляем до 3 знаков после запятой
-                        value = round(value, 3)
-                    else:
-                        # Для небольших чисел просто делим на 1e18 и округляем
-                        value = round(float(raw_value) / 1e18, 3)
-                    
-                    total_value += value
-                except (ValueError, OverflowError) as e:
-                    logger.warning(f"Error converting transaction value: {e}")
-                    value = 0
-                
-                if counterparty:
-                    mixer_transactions += 1
-                    mixer_value += value
-            except Exception as e:
-                logger.error(f"Error processing transaction: {e}")
+                wei[i] = float(raw_values[i])
+            except (ValueError, OverflowError) as e:
+                logger.warning("Error converting transaction value: %s", e)
+        
+        # Values longer than 15 characters are rounded to four significant figures first
+        long_values = (np.char.str_len(raw_values) > 15) & (wei > 0)
+        scale = 10.0 ** (np.floor(np.log10(wei[long_values])) - 3)
+        wei[long_values] = np.round(wei[long_values] / scale) * scale
+        values = np.round(wei / 1e18, 3)
+        
+        # Either side being a known mixer counts, checked with one set operation
+        is_mixer = np.array([
+            not KNOWN_MIXER_ADDRESSES.isdisjoint(((tx.get('from') or '').lower(), (tx.get('to') or '').lower()))
+            for tx in transactions
+        ])
+        mixer_transactions = int(is_mixer.sum())
+        mixer_value = float(values[is_mixer].sum())
+        total_value = float(values.sum())
         
         # Calculate percentage of value from/to mixers
         if total_value > 0:
@@ -357,36 +396,15 @@ class CryptoTransactionAnalyzer:
         
         # Check for suspicious patterns
         try:
-            # Предварительно обработаем транзакции для безопасного анализа
-            safe_transactions = []
-            for tx in transactions:
-                safe_tx = {}
-                for key, value in tx.items():
-                    # Преобразуем большие числа в строки перед добавлением в DataFrame
-                    if key in ['value', 'gasPrice', 'gas']:
-                        try:
-                            if isinstance(value, str) and len(value) > 15:
-                                # Для очень больших числовых строк, храним в научной нотации с округлением
-                                safe_tx[key] = '{:.3e}'.format(float(value))
-                            else:
-                                safe_tx[key] = value
-                        except (ValueError, TypeError):
-                            safe_tx[key] = '0'
-                    else:
-                        safe_tx[key] = value
-                safe_transactions.append(safe_tx)
-                
-            # Создаем DataFrame с защитой от переполнения
-            df = pd.DataFrame(safe_transactions)
+            n_transactions = len(transactions)
+            has_timestamps = any('timeStamp' in tx for tx in transactions)
+            timestamps = None
             
             # Check account age
-            if len(df) > 0 and 'timeStamp' in df.columns:
-                # Безопасно преобразуем метки времени
+            if has_timestamps:
                 try:
-                    df['timeStamp'] = df['timeStamp'].apply(lambda x: float(x) if x else 0)
-                    newest_tx = df['timeStamp'].max()
-                    oldest_tx = df['timeStamp'].min()
-                    account_age_days = round((newest_tx - oldest_tx) / (60 * 60 * 24), 3)
+                    timestamps = np.array([float(tx.get('timeStamp') or 0) for tx in transactions])
+                    account_age_days = round(float(timestamps.max() - timestamps.min()) / (60 * 60 * 24), 3)
                     
                     if account_age_days < 1:
                         risk_score = max(risk_score, 0.7)
@@ -395,37 +413,33 @@ class CryptoTransactionAnalyzer:
                         risk_score = max(risk_score, 0.4)
                         alerts.append(f"New account: less than 7 days old")
                 except Exception as e:
-                    logger.warning(f"Error processing timestamps: {e}")
+                    timestamps = None
+                    logger.warning("Error processing timestamps: %s", e)
             
             # Check transaction count
-            if len(df) == 1:
+            if n_transactions == 1:
                 risk_score = max(risk_score, 0.3)
                 alerts.append("Single transaction history")
             
             # Check for peeling chains (a chain of transactions decreasing in value)
             # This is a simplified check - a real implementation would be more sophisticated
-            if len(df) >= 3 and 'value' in df.columns:
+            if n_transactions >= 3 and any('value' in tx for tx in transactions):
                 try:
-                    # Безопасно преобразуем значения с защитой от переполнения
-                    df['safe_value'] = df['value'].apply(
-                        lambda x: float(x) if isinstance(x, (int, float)) or (isinstance(x, str) and len(x) < 15) 
-                        else float(x.split('e')[0]) * (10 ** float(x.split('e')[1])) if 'e' in str(x)
-                        else 0
-                    )
+                    # float() parses wei strings of any length without overflowing
+                    values = np.array([float(tx.get('value') or 0) for tx in transactions])
                     
                     # Sort by timestamp if available
-                    if 'timeStamp' in df.columns:
-                        df = df.sort_values('timeStamp')
+                    if timestamps is not None:
+                        values = values[np.argsort(timestamps, kind='stable')]
                     
                     # Check for decreasing values
-                    values = df['safe_value'].tolist()
-                    decreasing_count = sum(values[i] > values[i+1] for i in range(len(values)-1))
+                    decreasing_count = int((np.diff(values) < 0).sum())
                     
-                    if decreasing_count >= 2 and decreasing_count > len(values) * 0.5:
+                    if decreasing_count >= 2 and decreasing_count > n_transactions * 0.5:
                         risk_score = max(risk_score, 0.6)
                         alerts.append("Possible peeling chain detected (decreasing transaction values)")
                 except Exception as e:
-                    logger.warning(f"Error analyzing transaction values: {e}")
+                    logger.warning("Error analyzing transaction values: %s", e)
             
             # Add more pattern analyses as needed
             
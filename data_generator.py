@@ -1,68 +1,131 @@
+import os
 import pandas as pd
 import numpy as np
 from faker import Faker
-import random
-from typing import List, Dict, Any, Tuple
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Any, Tuple
 import logging
+from config import SAMPLE_BATCH_SIZE, PARALLEL_GENERATION_MIN_SAMPLES
 
 logger = logging.getLogger(__name__)
 
 # Initialize faker
 fake = Faker()
 
-def generate_synthetic_fiat_data(n_samples: int = 1000) -> pd.DataFrame:
+# NumPy Generator shared by the array-based generators
+rng = np.random.default_rng()
+
+# Fiat currencies and countries, sampled uniformly by index
+FIAT_CURRENCIES = np.array(['USD', 'EUR', 'GBP', 'JPY', 'AUD', 'CAD', 'CHF', 'CNY', 'HKD', 'NZD'])
+FIAT_COUNTRIES = np.array(['US', 'GB', 'DE', 'FR', 'JP', 'AU', 'CA', 'CH', 'CN', 'HK', 'NZ', 'RU', 'IN', 'BR', 'NG'])
+
+# Crypto currencies and their approximate values in USD
+CRYPTO_CURRENCIES = {
+    'ETH': 2500,
+    'BTC': 40000,
+    'USDT': 1,
+    'USDC': 1,
+    'BNB': 400,
+    'XRP': 0.5,
+    'SOL': 100,
+    'ADA': 0.4,
+    'DOGE': 0.1,
+    'MATIC': 0.8
+}
+_CRYPTO_CODES = np.array(list(CRYPTO_CURRENCIES))
+_CRYPTO_BASE_VALUES = np.array(list(CRYPTO_CURRENCIES.values()))
+
+# Log-normal (mu, sigma) of the amount and its decimal places, per crypto currency
+# Stablecoins often have larger transaction amounts, major cryptos smaller
+# fractional amounts; other altcoins fall in between
+_CRYPTO_AMOUNT_PARAMS = {'USDT': (5, 2, 2), 'USDC': (5, 2, 2), 'BTC': (-1, 1.5, 6), 'ETH': (-1, 1.5, 6)}
+_CRYPTO_MU, _CRYPTO_SIGMA, _CRYPTO_DECIMALS = np.array(
+    [_CRYPTO_AMOUNT_PARAMS.get(code, (2, 2, 4)) for code in _CRYPTO_CODES]
+).T
+
+def _generate_columns(generate: Callable[..., Tuple[np.ndarray, ...]], n_samples: int, *args) -> Tuple[np.ndarray, ...]:
     """
-    Generate synthetic fiat transaction data
+    Run a column generator, splitting large requests across worker processes
     
     Args:
+        generate: Module-level function taking (n_samples, generator, *args) and returning column arrays
         n_samples: Number of samples to generate
+        *args: Extra arguments passed to every call of generate
         
     Returns:
-        pd.DataFrame: Generated synthetic data
+        Tuple[np.ndarray, ...]: Column arrays covering all n_samples rows
     """
-    logger.info(f"Generating {n_samples} synthetic fiat transactions")
+    n_workers = min(os.cpu_count() or 1, n_samples)
+    if n_samples < PARALLEL_GENERATION_MIN_SAMPLES or n_workers < 2:
+        return generate(n_samples, rng, *args)
     
-    # List of currencies and countries
-    currencies = ['USD', 'EUR', 'GBP', 'JPY', 'AUD', 'CAD', 'CHF', 'CNY', 'HKD', 'NZD']
-    countries = ['US', 'GB', 'DE', 'FR', 'JP', 'AU', 'CA', 'CH', 'CN', 'HK', 'NZ', 'RU', 'IN', 'BR', 'NG']
+    # One chunk per worker, each with its own independent stream spawned from the shared generator
+    sizes = [len(chunk) for chunk in np.array_split(np.arange(n_samples), n_workers)]
+    generators = rng.spawn(n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        parts = list(executor.map(generate, sizes, generators, *([arg] * n_workers for arg in args)))
     
-    # Generate base data
-    data = []
-    for _ in range(n_samples):
-        # Base legitimate transaction
-        card_country = random.choice(countries)
-        geo_ip = card_country  # Most transactions have matching country
-        
-        # Introduce some anomalies (10% of transactions)
-        if random.random() < 0.1:
-            # Geo mismatch
-            geo_ip = random.choice([c for c in countries if c != card_country])
-        
-        # Generate transaction amount (log-normal distribution for more realistic amounts)
-        amount = np.exp(np.random.normal(5, 1.5))  # Centered around ~150 with long tail
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+def _fiat_columns(n_samples: int, gen: np.random.Generator) -> Tuple[np.ndarray, ...]:
+    """
+    Draw the columns of synthetic fiat transactions
+    
+    Countries and currencies are returned as indexes, which are cheaper to send
+    back from worker processes than arrays of strings.
+    
+    Args:
+        n_samples: Number of samples to generate
+        gen: NumPy Generator to draw from
         
-        # Create transaction
-        transaction = {
-            'amount': round(amount, 2),
-            'currency': random.choice(currencies),
-            'card_country': card_country,
-            'geo_ip': geo_ip
-        }
-        data.append(transaction)
+    Returns:
+        Tuple[np.ndarray, ...]: Amounts, currency indexes, card country indexes and geo country indexes
+    """
+    n_countries = len(FIAT_COUNTRIES)
+    
+    # Generate each column as a whole array rather than row by row
+    # Base legitimate transactions have matching card and geo countries
+    card_idx = gen.integers(n_countries, size=n_samples)
+    geo_idx = card_idx.copy()
+    
+    # Introduce some anomalies (10% of transactions)
+    # Geo mismatch: shift to one of the other countries, chosen uniformly
+    mismatch = gen.random(n_samples) < 0.1
+    geo_idx[mismatch] = (card_idx[mismatch] + gen.integers(1, n_countries, size=mismatch.sum())) % n_countries
     
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    # Generate transaction amount (log-normal distribution for more realistic amounts)
+    amounts = np.round(np.exp(gen.normal(5, 1.5, size=n_samples)), 2)  # Centered around ~150 with long tail
+    currency_idx = gen.integers(len(FIAT_CURRENCIES), size=n_samples)
     
     # Create some more complex anomalies
-    # 5% of transactions with unusual amounts
-    unusual_indices = np.random.choice(
-        range(n_samples), 
-        size=int(n_samples * 0.05), 
-        replace=False
-    )
-    df.loc[unusual_indices, 'amount'] = np.exp(np.random.normal(9, 1))  # Much larger amounts
+    # About 5% of transactions with unusual amounts, picked with a Bernoulli mask
+    unusual = gen.random(n_samples) < 0.05
+    amounts[unusual] = np.exp(gen.normal(9, 1, size=unusual.sum()))  # Much larger amounts
     
-    return df
+    return amounts, currency_idx, card_idx, geo_idx
+
+def generate_synthetic_fiat_data(n_samples: int = 1000) -> pd.DataFrame:
+    """
+    Generate synthetic fiat transaction data
+    
+    Args:
+        n_samples: Number of samples to generate
+        
+    Returns:
+        pd.DataFrame: Generated synthetic data
+    """
+    logger.info(f"Generating {n_samples} synthetic fiat transactions")
+    
+    amounts, currency_idx, card_idx, geo_idx = _generate_columns(_fiat_columns, n_samples)
+    
+    # Create DataFrame from the column arrays
+    return pd.DataFrame({
+        'amount': amounts,
+        'currency': FIAT_CURRENCIES[currency_idx],
+        'card_country': FIAT_COUNTRIES[card_idx],
+        'geo_ip': FIAT_COUNTRIES[geo_idx]
+    })
 
 def generate_synthetic_crypto_addresses(n_addresses: int = 100) -> List[str]:
     """
@@ -74,11 +137,9 @@ def generate_synthetic_crypto_addresses(n_addresses: int = 100) -> List[str]:
     Returns:
         List[str]: List of Ethereum addresses
     """
-    addresses = []
-    for _ in range(n_addresses):
-        address = "0x" + ''.join(random.choices('0123456789abcdef', k=40))
-        addresses.append(address)
-    return addresses
+    # One bulk draw of 20 random bytes per address, hex-encoded in C
+    hex_digits = rng.bytes(n_addresses * 20).hex()
+    return ["0x" + hex_digits[i:i + 40] for i in range(0, n_addresses * 40, 40)]
 
 def generate_mixed_risk_addresses(n_addresses: int = 100) -> Dict[str, float]:
     """
@@ -91,17 +152,37 @@ def generate_mixed_risk_addresses(n_addresses: int = 100) -> Dict[str, float]:
         Dict[str, float]: Dictionary mapping addresses to risk scores
     """
     addresses = generate_synthetic_crypto_addresses(n_addresses)
-    risk_scores = {}
     
-    for addr in addresses:
-        # Assign random risk score (mostly low, some high)
-        if random.random() < 0.8:  # 80% low risk
-            risk = random.uniform(0, 0.3)
-        else:  # 20% high risk
-            risk = random.uniform(0.7, 1.0)
-        risk_scores[addr] = risk
+    # Assign random risk score (mostly low, some high), drawn for all addresses at once
+    low_risk = rng.random(n_addresses) < 0.8  # 80% low risk
+    risks = np.where(
+        low_risk,
+        rng.uniform(0, 0.3, size=n_addresses),
+        rng.uniform(0.7, 1.0, size=n_addresses)  # 20% high risk
+    )
     
-    return risk_scores
+    return dict(zip(addresses, risks.tolist()))
+
+def _crypto_columns(n_samples: int, gen: np.random.Generator, n_addresses: int) -> Tuple[np.ndarray, ...]:
+    """
+    Draw the columns of synthetic crypto transactions
+    
+    Args:
+        n_samples: Number of samples to generate
+        gen: NumPy Generator to draw from
+        n_addresses: Size of the address pool to pick from
+        
+    Returns:
+        Tuple[np.ndarray, ...]: Address indexes, currency indexes and amounts
+    """
+    currency_idx = gen.integers(len(_CRYPTO_CODES), size=n_samples)
+    amounts = gen.lognormal(_CRYPTO_MU[currency_idx], _CRYPTO_SIGMA[currency_idx])
+    decimals = _CRYPTO_DECIMALS[currency_idx]
+    for places in np.unique(decimals):
+        rounded = decimals == places
+        amounts[rounded] = np.round(amounts[rounded], int(places))
+    
+    return gen.integers(n_addresses, size=n_samples), currency_idx, amounts
 
 def generate_synthetic_crypto_data(n_samples: int = 1000) -> pd.DataFrame:
     """
@@ -116,87 +197,90 @@ def generate_synthetic_crypto_data(n_samples: int = 1000) -> pd.DataFrame:
     logger.info(f"Generating {n_samples} synthetic crypto transactions")
     
     # Generate addresses
-    addresses = generate_synthetic_crypto_addresses(n_samples // 10)  # Reuse addresses
-    
-    # Currencies and their approximate values in USD
-    crypto_currencies = {
-        'ETH': 2500,
-        'BTC': 40000,
-        'USDT': 1,
-        'USDC': 1,
-        'BNB': 400,
-        'XRP': 0.5,
-        'SOL': 100,
-        'ADA': 0.4,
-        'DOGE': 0.1,
-        'MATIC': 0.8
-    }
-    
-    # Generate transactions
-    data = []
-    for _ in range(n_samples):
-        currency = random.choice(list(crypto_currencies.keys()))
-        base_value = crypto_currencies[currency]
-        
-        # Generate amount (in the cryptocurrency)
-        if currency in ['USDT', 'USDC']:
-            # Stablecoins often have larger transaction amounts
-            amount = round(random.lognormvariate(5, 2), 2)
-        elif currency in ['BTC', 'ETH']:
-            # Major cryptos often have smaller fractional amounts
-            amount = round(random.lognormvariate(-1, 1.5), 6)
-        else:
-            # Other altcoins
-            amount = round(random.lognormvariate(2, 2), 4)
-        
-        transaction = {
-            'address': random.choice(addresses),
-            'currency': currency,
-            'amount': amount,
-            'usd_value': round(amount * base_value, 2)
-        }
-        data.append(transaction)
+    addresses = np.array(generate_synthetic_crypto_addresses(n_samples // 10))  # Reuse addresses
+    
+    # Generate every column as a whole array
+    address_idx, currency_idx, amounts = _generate_columns(_crypto_columns, n_samples, len(addresses))
     
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        'address': addresses[address_idx],
+        'currency': _CRYPTO_CODES[currency_idx],
+        'amount': amounts,
+        'usd_value': np.round(amounts * _CRYPTO_BASE_VALUES[currency_idx], 2)
+    })
 
-def generate_sample_transaction() -> Dict[str, Any]:
+# Choices for the sample transactions shown in the UI and the fraud check form
+_SAMPLE_CARD_COUNTRIES = np.array(['US', 'GB', 'DE', 'FR', 'JP', 'AU', 'CA'])
+_SAMPLE_GEO_COUNTRIES = np.array(['US', 'GB', 'DE', 'FR', 'JP', 'RU', 'NG', 'IN'])
+_SAMPLE_FIAT_CURRENCIES = np.array(['USD', 'EUR', 'GBP'])
+_SAMPLE_CRYPTO_CURRENCIES = np.array(['ETH', 'BTC', 'USDT', 'USDC'])
+
+_sample_buffer: List[Dict[str, Any]] = []
+_sample_lock = threading.Lock()
+
+def _generate_sample_batch(n: int) -> List[Dict[str, Any]]:
     """
-    Generate a sample transaction combining fiat and crypto data
+    Generate sample transactions with one NumPy draw per field
     
+    Args:
+        n: Number of sample transactions to generate
+        
     Returns:
-        Dict[str, Any]: Sample transaction data
+        List[Dict[str, Any]]: Sample transactions as returned by generate_sample_transaction
     """
     # Generate country info
-    card_country = random.choice(['US', 'GB', 'DE', 'FR', 'JP', 'AU', 'CA'])
+    card_countries = _SAMPLE_CARD_COUNTRIES[rng.integers(len(_SAMPLE_CARD_COUNTRIES), size=n)]
     
     # 85% chance of geo matching card country
-    if random.random() < 0.85:
-        geo_ip = card_country
-    else:
-        geo_ip = random.choice(['US', 'GB', 'DE', 'FR', 'JP', 'RU', 'NG', 'IN'])
+    geo_ips = np.where(
+        rng.random(n) < 0.85,
+        card_countries,
+        _SAMPLE_GEO_COUNTRIES[rng.integers(len(_SAMPLE_GEO_COUNTRIES), size=n)]
+    )
     
     # Generate amount (log-normal for realistic amounts)
-    amount = round(np.exp(np.random.normal(5, 1.5)), 2)
+    amounts = np.round(np.exp(rng.normal(5, 1.5, size=n)), 2)
     
     # Generate crypto part
-    crypto = {
-        'address': "0x" + ''.join(random.choices('0123456789abcdef', k=40)),
-        'currency': random.choice(['ETH', 'BTC', 'USDT', 'USDC']),
-        'amount': round(random.lognormvariate(0, 1), 6)
-    }
-    
-    # Create transaction
-    transaction = {
-        'fiat': {
-            'amount': amount,
-            'currency': random.choice(['USD', 'EUR', 'GBP']),
-            'card_country': card_country,
-            'geo_ip': geo_ip
-        },
-        'crypto': crypto
-    }
-    
-    return transaction
+    addresses = generate_synthetic_crypto_addresses(n)
+    crypto_currencies = _SAMPLE_CRYPTO_CURRENCIES[rng.integers(len(_SAMPLE_CRYPTO_CURRENCIES), size=n)]
+    crypto_amounts = np.round(rng.lognormal(0, 1, size=n), 6)
+    fiat_currencies = _SAMPLE_FIAT_CURRENCIES[rng.integers(len(_SAMPLE_FIAT_CURRENCIES), size=n)]
+    
+    # Create transactions from plain Python values so they serialize like before
+    return [
+        {
+            'fiat': {
+                'amount': amount,
+                'currency': fiat_currency,
+                'card_country': card_country,
+                'geo_ip': geo_ip
+            },
+            'crypto': {
+                'address': address,
+                'currency': crypto_currency,
+                'amount': crypto_amount
+            }
+        }
+        for amount, fiat_currency, card_country, geo_ip, address, crypto_currency, crypto_amount in zip(
+            amounts.tolist(), fiat_currencies.tolist(), card_countries.tolist(), geo_ips.tolist(),
+            addresses, crypto_currencies.tolist(), crypto_amounts.tolist()
+        )
+    ]
+
+def generate_sample_transaction() -> Dict[str, Any]:
+    """
+    Generate a sample transaction combining fiat and crypto data
+    
+    Transactions are generated SAMPLE_BATCH_SIZE at a time and handed out one per call.
+    
+    Returns:
+        Dict[str, Any]: Sample transaction data
+    """
+    with _sample_lock:
+        if not _sample_buffer:
+            _sample_buffer.extend(_generate_sample_batch(SAMPLE_BATCH_SIZE))
+        return _sample_buffer.pop()
 
 if __name__ == "__main__":
     # Test data generation
@@ -0,0 +1,40 @@
+"""
+ItisPay Fraud Detection - Database Sessions
+Plain SQLAlchemy engine and session factory for code that runs outside a
+Flask app context, such as the FastAPI service. The Flask apps keep using
+the Flask-SQLAlchemy `db` object from models.py.
+
+Create or migrate the tables once per deploy, before starting the API workers:
+    python -m database
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_ASYNC_COMMIT
+from models import db, migrate_risk_level_codes, create_missing_indexes
+
+connect_args = {}
+if DB_ASYNC_COMMIT and DATABASE_URL.startswith("postgres"):
+    connect_args["options"] = "-c synchronous_commit=off"
+
+# Connections are only checked out once a session actually runs a query
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args=connect_args
+)
+
+# Keep attributes loaded after commit so callers can read ids without another SELECT
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+def create_tables() -> None:
+    """Create any missing tables for the models in models.py and bring older ones up to date"""
+    db.metadata.create_all(engine)
+    migrate_risk_level_codes(engine)
+    create_missing_indexes(engine)
+
+if __name__ == '__main__':
+    create_tables()
@@ -3,8 +3,9 @@ FATF (Financial Action Task Force) Grey List
 Source: FATF website (as of April 2023)
 """
 
-# Countries on the FATF Grey List (Jurisdictions under Increased Monitoring)
-FATF_GREY_LIST = [
+# Countries on the FATF Grey List (Jurisdictions under Increased Monitoring);
+# frozensets so membership checks are hashed lookups
+FATF_GREY_LIST = frozenset([
     'AL',  # Albania
     'BB',  # Barbados
     'BF',  # Burkina Faso
@@ -32,19 +33,25 @@ FATF_GREY_LIST = [
     'UG',  # Uganda
     'YE',  # Yemen
     'ZW'   # Zimbabwe
-]
+])
 
 # Convert to lowercase for case-insensitive matching
-FATF_GREY_LIST_LOWER = [country.lower() for country in FATF_GREY_LIST]
+FATF_GREY_LIST_LOWER = frozenset(country.lower() for country in FATF_GREY_LIST)
 
 # Countries on the FATF Black List (Call for Action)
-FATF_BLACK_LIST = [
+FATF_BLACK_LIST = frozenset([
     'KP',  # North Korea
     'IR'   # Iran
-]
+])
 
 # Convert to lowercase for case-insensitive matching
-FATF_BLACK_LIST_LOWER = [country.lower() for country in FATF_BLACK_LIST]
+FATF_BLACK_LIST_LOWER = frozenset(country.lower() for country in FATF_BLACK_LIST)
+
+# List type and risk score for every listed country, black list taking precedence
+_FATF_ENTRIES = {
+    **{country: ('Grey List (Increased Monitoring)', 0.7) for country in FATF_GREY_LIST},
+    **{country: ('Black List (Call for Action)', 1.0) for country in FATF_BLACK_LIST}
+}
 
 # Function to check if a country is on the FATF lists
 def is_fatf_listed(country_code: str) -> dict:
@@ -57,21 +64,16 @@ def is_fatf_listed(country_code: str) -> dict:
     Returns:
         dict: Result with keys 'listed' (bool), 'list_type' (str or None), 'risk_score' (float 0-1)
     """
-    country_code = country_code.upper()
+    entry = _FATF_ENTRIES.get(country_code.upper())
+    if entry is None:
+        return {
+            'listed': False,
+            'list_type': None,
+            'risk_score': 0.0
+        }
     
-    result = {
-        'listed': False,
-        'list_type': None,
-        'risk_score': 0.0
+    return {
+        'listed': True,
+        'list_type': entry[0],
+        'risk_score': entry[1]
     }
-    
-    if country_code in FATF_BLACK_LIST:
-        result['listed'] = True
-        result['list_type'] = 'Black List (Call for Action)'
-        result['risk_score'] = 1.0
-    elif country_code in FATF_GREY_LIST:
-        result['listed'] = True
-        result['list_type'] = 'Grey List (Increased Monitoring)'
-        result['risk_score'] = 0.7
-    
-    return result
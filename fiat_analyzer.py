@@ -3,8 +3,11 @@ import pandas as pd
 from sklearn.ensemble import IsolationForest
 from typing import Dict, List, Tuple, Any, Optional
 import logging
+import threading
 from config import ISOLATION_FOREST_CONTAMINATION, ISOLATION_FOREST_RANDOM_STATE
 from utils import is_valid_ip, get_country_from_ip, normalize_score
+from fatf_lists import FATF_GREY_LIST
+from isolation_forest import FlatIsolationForest
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -22,7 +25,16 @@ class FiatTransactionAnalyzer:
             random_state=ISOLATION_FOREST_RANDOM_STATE
         )
         self.is_trained = False
-        self.training_data = pd.DataFrame()
+        
+        # Model input columns, recorded at training time
+        self.feature_columns: Optional[List[str]] = None
+        
+        # Flattened copy of the model and the column lookup for building features, built on first use
+        self._flat_model = None
+        self._column_index: Dict[str, int] = {}
+        
+        # Per-thread feature matrix reused across requests
+        self._buffers = threading.local()
         
         # Feature importance tracking (for explanation)
         self.feature_importance = {}
@@ -45,10 +57,11 @@ class FiatTransactionAnalyzer:
         # Preprocess the data
         X = self._preprocess_data(data)
         
-        # Train the model
-        self.model.fit(X)
+        # Train the model on a contiguous float32 array, the dtype sklearn's trees use internally
+        self.model.fit(np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+        self.feature_columns = list(X.columns)
+        self._flat_model = None
         self.is_trained = True
-        self.training_data = data.copy()
         
         logger.info("Fiat anomaly detection model trained successfully")
     
@@ -62,34 +75,22 @@ class FiatTransactionAnalyzer:
         Returns:
             pd.DataFrame: Preprocessed data ready for the model
         """
-        # Make a copy to avoid modifying the original
-        processed = data.copy()
-        
-        # One-hot encode categorical features
-        if 'currency' in processed.columns:
-            currency_dummies = pd.get_dummies(processed['currency'], prefix='currency')
-            processed = pd.concat([processed, currency_dummies], axis=1)
-        
-        if 'card_country' in processed.columns:
-            card_country_dummies = pd.get_dummies(processed['card_country'], prefix='card')
-            processed = pd.concat([processed, card_country_dummies], axis=1)
-        
-        if 'geo_ip' in processed.columns:
-            geo_ip_dummies = pd.get_dummies(processed['geo_ip'], prefix='geo')
-            processed = pd.concat([processed, geo_ip_dummies], axis=1)
+        # Pass other columns through, then add all derived columns with a single concat
+        # The categorical fields are not one-hot encoded: pd.get_dummies yields bool columns,
+        # which the numeric filter below dropped, so the model never used them
+        pieces = [data.drop(columns=['currency', 'card_country', 'geo_ip', 'amount'], errors='ignore')]
         
+        derived = {}
         # Create a geo mismatch feature
-        if 'card_country' in processed.columns and 'geo_ip' in processed.columns:
-            processed['geo_mismatch'] = (processed['card_country'] != processed['geo_ip']).astype(int)
+        if 'card_country' in data.columns and 'geo_ip' in data.columns:
+            derived['geo_mismatch'] = (data['card_country'] != data['geo_ip']).astype(int)
         
-        # Drop the original categorical columns
-        processed = processed.drop(columns=['currency', 'card_country', 'geo_ip'], errors='ignore')
+        # Log transformation of amount
+        if 'amount' in data.columns:
+            derived['log_amount'] = np.log1p(data['amount'])
+        pieces.append(pd.DataFrame(derived, index=data.index))
         
-        # Add any other preprocessing steps as needed
-        # For example, log transformation of amount
-        if 'amount' in processed.columns:
-            processed['log_amount'] = np.log1p(processed['amount'])
-            processed = processed.drop(columns=['amount'])
+        processed = pd.concat(pieces, axis=1)
         
         # Filter out any non-numeric columns
         numeric_columns = processed.select_dtypes(include=[np.number]).columns
@@ -105,34 +106,62 @@ class FiatTransactionAnalyzer:
         Returns:
             Tuple[float, List[str]]: Risk score (0-1) and list of alerts
         """
-        logger.info(f"Analyzing fiat transaction: {transaction}")
+        return self.analyze_batch([transaction])[0]
+    
+    def analyze_batch(self, transactions: List[Dict[str, Any]]) -> List[Tuple[float, List[str]]]:
+        """
+        Analyze several fiat transactions, scoring them with a single model call
         
-        # Initialize empty alerts list
-        alerts = []
+        Args:
+            transactions: List of dictionaries with transaction details
+            
+        Returns:
+            List[Tuple[float, List[str]]]: Risk score (0-1) and list of alerts for each transaction
+        """
+        results: List[Optional[Tuple[float, List[str]]]] = [None] * len(transactions)
         
         # Validate transaction data
-        if not self._validate_transaction(transaction):
-            logger.warning("Invalid transaction data")
-            return 0.8, ["Invalid transaction data"]
+        valid_indices = []
+        for i, transaction in enumerate(transactions):
+            logger.debug("Analyzing fiat transaction: %r", transaction)
+            if self._validate_transaction(transaction):
+                valid_indices.append(i)
+            else:
+                logger.warning("Invalid transaction data")
+                results[i] = (0.8, ["Invalid transaction data"])
         
-        # Basic rule-based checks
-        rule_score, rule_alerts = self._rule_based_analysis(transaction)
-        alerts.extend(rule_alerts)
+        if not valid_indices:
+            return results
         
-        # Model-based anomaly detection
+        # Model-based anomaly detection for all valid transactions at once
         if self.is_trained:
-            model_score, model_alerts = self._model_based_analysis(transaction)
-            alerts.extend(model_alerts)
-            
-            # Combine rule-based and model-based scores (weighted average)
-            combined_score = 0.7 * model_score + 0.3 * rule_score
+            model_results = self._model_based_batch([transactions[i] for i in valid_indices])
         else:
             # If the model is not trained, use only rule-based score
             logger.warning("Model not trained, using only rule-based analysis")
-            combined_score = rule_score
+            model_results = [None] * len(valid_indices)
+        
+        # Basic rule-based checks for all valid transactions at once
+        rule_results = self._rule_based_batch([transactions[i] for i in valid_indices])
+        
+        for i, model_result, (rule_score, rule_alerts) in zip(valid_indices, model_results, rule_results):
+            # Initialize empty alerts list
+            alerts = []
+            alerts.extend(rule_alerts)
+            
+            if model_result is not None:
+                model_score, model_alerts = model_result
+                alerts.extend(model_alerts)
+                
+                # Combine rule-based and model-based scores (weighted average)
+                combined_score = 0.7 * model_score + 0.3 * rule_score
+            else:
+                combined_score = rule_score
+            
+            logger.info("Fiat analysis result: score=%s, alerts=%s", combined_score, alerts)
+            results[i] = (combined_score, alerts)
         
-        logger.info(f"Fiat analysis result: score={combined_score}, alerts={alerts}")
-        return combined_score, alerts
+        return results
     
     def _validate_transaction(self, transaction: Dict[str, Any]) -> bool:
         """
@@ -157,102 +186,144 @@ class FiatTransactionAnalyzer:
         
         return True
     
-    def _rule_based_analysis(self, transaction: Dict[str, Any]) -> Tuple[float, List[str]]:
+    def _rule_based_batch(self, transactions: List[Dict[str, Any]]) -> List[Tuple[float, List[str]]]:
         """
-        Perform rule-based analysis on the transaction
+        Perform rule-based analysis on several transactions in one pass
         
         Args:
-            transaction: Dictionary with transaction details
+            transactions: List of validated dictionaries with transaction details
             
         Returns:
-            Tuple[float, List[str]]: Risk score (0-1) and list of alerts
+            List[Tuple[float, List[str]]]: Risk score (0-1) and list of alerts for each transaction
         """
-        risk_score = 0.0
-        alerts = []
-        
-        # Check for geo mismatch
-        if transaction['card_country'] != transaction['geo_ip']:
-            # Get actual country from IP if it's a valid IP format
-            if is_valid_ip(transaction['geo_ip']):
-                ip_country = get_country_from_ip(transaction['geo_ip'])
-                if ip_country and ip_country != transaction['card_country']:
+        # An IP is resolved to its country once per batch
+        ip_countries = {}
+        results = []
+        for transaction in transactions:
+            risk_score = 0.0
+            alerts = []
+            card_country = transaction['card_country']
+            geo_ip = transaction['geo_ip']
+            
+            # Check for geo mismatch
+            if card_country != geo_ip:
+                # Get actual country from IP if it's a valid IP format
+                if is_valid_ip(geo_ip):
+                    if geo_ip not in ip_countries:
+                        ip_countries[geo_ip] = get_country_from_ip(geo_ip)
+                    ip_country = ip_countries[geo_ip]
+                    if ip_country and ip_country != card_country:
+                        risk_score += 0.5
+                        alerts.append(f"Geo mismatch: {ip_country} IP vs {card_country} card")
+                else:
+                    # If it's a country code directly
                     risk_score += 0.5
-                    alerts.append(f"Geo mismatch: {ip_country} IP vs {transaction['card_country']} card")
-            else:
-                # If it's a country code directly
-                risk_score += 0.5
-                alerts.append(f"Geo mismatch: {transaction['geo_ip']} vs {transaction['card_country']}")
-        
-        # Check for unusual amount
-        amount = transaction['amount']
-        if amount > 10000:
-            risk_score += 0.3
-            alerts.append(f"Large transaction amount: {amount} {transaction['currency']}")
-        
-        # Check for high-risk countries
-        from fatf_lists import FATF_GREY_LIST
-        if transaction['card_country'] in FATF_GREY_LIST:
-            risk_score += 0.4
-            alerts.append(f"Card from FATF grey-listed country: {transaction['card_country']}")
-        
-        if transaction['geo_ip'] in FATF_GREY_LIST:
-            risk_score += 0.4
-            alerts.append(f"IP from FATF grey-listed country: {transaction['geo_ip']}")
-        
-        # Cap the risk score at 1.0
-        risk_score = min(risk_score, 1.0)
-        
-        return risk_score, alerts
+                    alerts.append(f"Geo mismatch: {geo_ip} vs {card_country}")
+            
+            # Check for unusual amount
+            amount = transaction['amount']
+            if amount > 10000:
+                risk_score += 0.3
+                alerts.append(f"Large transaction amount: {amount} {transaction['currency']}")
+            
+            # Check for high-risk countries
+            if card_country in FATF_GREY_LIST:
+                risk_score += 0.4
+                alerts.append(f"Card from FATF grey-listed country: {card_country}")
+            
+            if geo_ip in FATF_GREY_LIST:
+                risk_score += 0.4
+                alerts.append(f"IP from FATF grey-listed country: {geo_ip}")
+            
+            # Cap the risk score at 1.0
+            results.append((min(risk_score, 1.0), alerts))
+        
+        return results
     
-    def _model_based_analysis(self, transaction: Dict[str, Any]) -> Tuple[float, List[str]]:
+    def _get_flat_model(self) -> FlatIsolationForest:
         """
-        Perform model-based anomaly detection on the transaction
+        Return the flattened model, rebuilding it and the column lookup if the model changed
         
-        Args:
-            transaction: Dictionary with transaction details
-            
         Returns:
-            Tuple[float, List[str]]: Risk score (0-1) and list of alerts
+            FlatIsolationForest: Scorer with the same results as model.decision_function
         """
-        # Convert transaction to DataFrame
-        df = pd.DataFrame([transaction])
-        
-        # Preprocess the transaction
-        X = self._preprocess_data(df)
-        
-        # Ensure the columns match the training data
-        trained_columns = self._preprocess_data(self.training_data.head(1)).columns
-        missing_columns = set(trained_columns) - set(X.columns)
-        
-        # Add missing columns with zeros
-        for col in missing_columns:
-            X[col] = 0
-        
-        # Ensure column order matches
-        X = X[trained_columns]
+        flat_model = self._flat_model
+        # Rebuild after the model has been retrained or replaced by RiskScorer.load
+        if flat_model is None or flat_model.model is not self.model:
+            self._column_index = {column: j for j, column in enumerate(self.feature_columns)}
+            flat_model = self._flat_model = FlatIsolationForest(self.model)
+        return flat_model
+    
+    def _build_features(self, transactions: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Write the model features for each transaction into this thread's reusable buffer
         
-        # Get anomaly score
-        anomaly_score = self.model.decision_function([X.iloc[0].values])[0]
+        Produces the same values as _preprocess_data followed by reindexing to the
+        training columns, without building a DataFrame per request.
         
-        # Convert to risk score (inverted, normalize from -1 to 1 range to 0 to 1)
-        # Anomaly scores are negative for outliers, positive for inliers
-        risk_score = (0.5 - (anomaly_score / 2))
+        Args:
+            transactions: List of validated dictionaries with transaction details
+            
+        Returns:
+            np.ndarray: float32 view of shape (len(transactions), number of features)
+        """
+        columns = self.feature_columns
+        buffer = getattr(self._buffers, 'features', None)
+        if buffer is None or buffer.shape[0] < len(transactions) or buffer.shape[1] != len(columns):
+            buffer = self._buffers.features = np.empty((len(transactions), len(columns)), dtype=np.float32)
+        X = buffer[:len(transactions)]
+        
+        for j, column in enumerate(columns):
+            if column == 'log_amount':
+                X[:, j] = np.log1p([float(t['amount']) for t in transactions])
+            elif column == 'geo_mismatch':
+                X[:, j] = [t['card_country'] != t['geo_ip'] for t in transactions]
+            else:
+                # Other numeric training columns are passed through; anything absent is 0
+                X[:, j] = [t.get(column, 0) for t in transactions]
+        return X
+    
+    def _model_based_batch(self, transactions: List[Dict[str, Any]]) -> List[Tuple[float, List[str]]]:
+        """
+        Perform model-based anomaly detection on several transactions with one model call
         
-        # Generate alerts
-        alerts = []
-        if risk_score > 0.7:
-            alerts.append("Transaction flagged as anomalous by ML model")
+        Args:
+            transactions: List of dictionaries with transaction details
+            
+        Returns:
+            List[Tuple[float, List[str]]]: Risk score (0-1) and list of alerts for each transaction
+        """
+        flat_model = self._get_flat_model()
+        geo_mismatch_index = self._column_index.get('geo_mismatch')
+        log_amount_index = self._column_index.get('log_amount')
+        X = self._build_features(transactions)
+        
+        # Get anomaly scores for the whole batch
+        anomaly_scores = flat_model.decision_function(X)
+        
+        results = []
+        for i, anomaly_score in enumerate(anomaly_scores):
+            # Convert to risk score (inverted, normalize from -1 to 1 range to 0 to 1)
+            # Anomaly scores are negative for outliers, positive for inliers
+            risk_score = (0.5 - (anomaly_score / 2))
             
-            # Add more detailed explanation
-            # For now, just a placeholder, could be enhanced with SHAP values etc.
-            if 'geo_mismatch' in X.columns and X['geo_mismatch'].iloc[0] > 0:
-                alerts.append("Unusual geographic pattern detected")
+            # Generate alerts
+            alerts = []
+            if risk_score > 0.7:
+                alerts.append("Transaction flagged as anomalous by ML model")
+                
+                # Add more detailed explanation
+                # For now, just a placeholder, could be enhanced with SHAP values etc.
+                if geo_mismatch_index is not None and X[i, geo_mismatch_index] > 0:
+                    alerts.append("Unusual geographic pattern detected")
+                
+                if log_amount_index is not None:
+                    if X[i, log_amount_index] > np.log1p(5000):
+                        alerts.append("Unusual transaction amount")
             
-            if 'log_amount' in X.columns:
-                if X['log_amount'].iloc[0] > np.log1p(5000):
-                    alerts.append("Unusual transaction amount")
+            results.append((risk_score, alerts))
         
-        return risk_score, alerts
+        return results
 
 if __name__ == "__main__":
     # Example usage
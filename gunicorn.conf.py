@@ -0,0 +1,87 @@
+"""
+Gunicorn settings shared by the Flask and FastAPI deployments.
+
+The app is imported once in the master and workers are forked from it, so
+the trained models are loaded a single time and their memory pages are
+shared copy-on-write between workers.
+
+The Flask app runs on gevent workers so database and Etherscan calls yield
+to other requests instead of blocking the worker:
+    gunicorn -b 0.0.0.0:5000 main:app
+For the FastAPI app, pick the Uvicorn worker through the environment (not -k),
+so gevent's monkey patching is skipped:
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -b 0.0.0.0:8000 api:app
+Create or migrate the tables once per deploy beforehand, with
+`flask --app app_unified db-init` or `python -m database`.
+Both default to 2 * CPUs + 1 workers; set WEB_CONCURRENCY or pass -w to override.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+
+# Import the app in the master before forking workers
+preload_app = True
+
+# Workers are preloaded and share the models, so each extra one mostly costs its request state
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+# Maximum concurrent requests per gevent worker
+worker_connections = 1000
+# Seconds to hold idle keep-alive connections open; with async workers an idle
+# connection costs only a greenlet, so browsers can reuse it for the page's assets
+keepalive = 5
+
+def _make_psycopg_green():
+    """Let psycopg2 wait for PostgreSQL through gevent, so queries yield to other greenlets"""
+    from psycopg2 import extensions, OperationalError
+    from gevent.socket import wait_read, wait_write
+    
+    def gevent_wait_callback(conn, timeout=None):
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(conn.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(conn.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f"Bad result from poll: {state!r}")
+    
+    extensions.set_wait_callback(gevent_wait_callback)
+
+if worker_class == "gevent":
+    # The gevent worker patches when it starts, but with preload_app the app (and
+    # threading, socket and ssl) is already imported by then, so patch first
+    from gevent import monkey
+    monkey.patch_all()
+    _make_psycopg_green()
+
+def when_ready(server):
+    """Load the risk models in the master once the app has been imported"""
+    api = sys.modules.get("api")
+    if api is not None:
+        api.warm_start_models()
+    
+    # Keep the garbage collector from touching (and so copying) shared objects
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Restart per-process threads and drop database connections inherited from the master"""
+    api = sys.modules.get("api")
+    if api is not None:
+        # Threads don't survive fork, so API log records would never be written
+        api.restart_log_listener()
+    
+    database = sys.modules.get("database")
+    if database is not None:
+        database.engine.dispose(close=False)
+    
+    app_unified = sys.modules.get("app_unified")
+    if app_unified is not None:
+        app_unified.restart_log_listener()
+        with app_unified.app.app_context():
+            app_unified.db.engine.dispose(close=False)
@@ -0,0 +1,46 @@
+"""
+ItisPay Fraud Detection - Static Page Export
+Renders the static Flask pages to dist/ so a reverse proxy can serve them
+without a round trip to Gunicorn.
+
+Usage:
+    python make_static.py [output_dir]
+
+Example nginx configuration, falling back to Flask for everything else:
+
+    location = / { try_files /index.html @flask; }
+    location / { try_files $uri.html @flask; }
+    location @flask { proxy_pass http://127.0.0.1:5000; }
+    location /static/ { alias /path/to/repo/static/; expires max; }
+
+with `root` pointing at the output directory.
+"""
+
+import os
+import sys
+import logging
+from app_unified import app, STATIC_ROUTES
+
+logger = logging.getLogger(__name__)
+
+def export_static_pages(output_dir: str = 'dist') -> None:
+    """
+    Write every route in STATIC_ROUTES to output_dir
+
+    Args:
+        output_dir: Directory to write the HTML files to
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    client = app.test_client()
+    for route, filename in STATIC_ROUTES.items():
+        response = client.get(route)
+        if response.status_code != 200:
+            raise RuntimeError(f"{route} returned HTTP {response.status_code}")
+
+        path = os.path.join(output_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(response.data)
+        logger.info(f"Wrote {route} to {path}")
+
+if __name__ == '__main__':
+    export_static_pages(sys.argv[1] if len(sys.argv) > 1 else 'dist')
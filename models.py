@@ -5,16 +5,31 @@ This module defines SQLAlchemy ORM models for the fraud detection system.
 import datetime
 from typing import Dict, Any, List, Optional
 
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import (
+    Column, Integer, SmallInteger, String, Float, Text, DateTime, Boolean, ForeignKey, JSON, Index,
+    case, inspect, text
+)
 from sqlalchemy.orm import relationship
 from flask_sqlalchemy import SQLAlchemy
 
+from utils import RISK_LEVEL_CODES
+
 # This will be initialized in main.py
 db = SQLAlchemy()
 
 class Transaction(db.Model):
     """Base transaction model containing shared properties"""
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Serves the Flask history filters (type, risk range) ordered by recency
+        Index('ix_txn_type_risk_ts', 'transaction_type', 'risk_score', 'timestamp'),
+        # Same filters for the FastAPI history, which pages by id instead of timestamp
+        Index('ix_txn_type_risk_id', 'transaction_type', 'risk_score', 'id'),
+        # Unfiltered history pages walk this backwards and stop at the page limit
+        Index('ix_txn_timestamp', 'timestamp'),
+        # Serves the risk level histogram
+        Index('ix_txn_risk_level_code', 'risk_level_code'),
+    )
     
     id = Column(Integer, primary_key=True)
     transaction_type = Column(String(10), nullable=False)  # 'fiat' or 'crypto'
@@ -27,6 +42,7 @@ class Transaction(db.Model):
     # Risk assessment result
     risk_score = Column(Float, nullable=False)
     risk_level = Column(String(20), nullable=False)  # Low, Medium, High, Critical
+    risk_level_code = Column(SmallInteger, nullable=True)  # Position of risk_level in utils.RISK_LEVELS
     alerts = Column(JSON, nullable=True)  # Store alert messages as JSON array
     
     # Relationship to specific transaction types
@@ -55,8 +71,10 @@ class Transaction(db.Model):
             Transaction: New transaction record
         """
         # Determine transaction type and create base record
-        has_fiat = transaction_data.get('fiat') is not None
-        has_crypto = transaction_data.get('crypto') is not None
+        fiat_data = transaction_data.get('fiat')
+        crypto_data = transaction_data.get('crypto')
+        has_fiat = fiat_data is not None
+        has_crypto = crypto_data is not None
         
         if has_fiat and has_crypto:
             transaction_type = 'both'
@@ -65,42 +83,40 @@ class Transaction(db.Model):
         else:
             transaction_type = 'crypto'
         
+        # Use either fiat or crypto amount and currency as the main ones
+        main_data = fiat_data if has_fiat else crypto_data
+        
         # Create base transaction record
         # Make sure numeric values are properly converted to Python native types
-        risk_score = float(analysis_result['risk_score'])
-        amount = float(transaction_data.get('fiat', {}).get('amount')) if has_fiat else float(transaction_data.get('crypto', {}).get('amount'))
-        
         transaction = cls(
             transaction_type=transaction_type,
-            risk_score=risk_score,
+            risk_score=float(analysis_result['risk_score']),
             risk_level=analysis_result['risk_level'],
+            risk_level_code=RISK_LEVEL_CODES.get(analysis_result['risk_level']),
             alerts=analysis_result['alerts'],
-            # Use either fiat or crypto amount as the main amount
-            amount=amount,
-            currency=transaction_data.get('fiat', {}).get('currency') if has_fiat else transaction_data.get('crypto', {}).get('currency')
+            amount=float(main_data.get('amount')),
+            currency=main_data.get('currency')
         )
         
         # Create related detail records
         if has_fiat:
-            fiat_data = transaction_data['fiat']
-            fiat_details = FiatTransactionDetails(
+            fiat_risk = analysis_result.get('fiat_risk') or {}
+            transaction.fiat_details = FiatTransactionDetails(
                 card_country=fiat_data.get('card_country'),
                 geo_ip=fiat_data.get('geo_ip'),
-                mismatch_location=analysis_result.get('fiat_risk', {}).get('mismatch_location', False),
-                fatf_listed=analysis_result.get('fiat_risk', {}).get('fatf_listed', False),
-                amount_anomaly=analysis_result.get('fiat_risk', {}).get('amount_anomaly', False)
+                mismatch_location=fiat_risk.get('mismatch_location', False),
+                fatf_listed=fiat_risk.get('fatf_listed', False),
+                amount_anomaly=fiat_risk.get('amount_anomaly', False)
             )
-            transaction.fiat_details = fiat_details
         
         if has_crypto:
-            crypto_data = transaction_data['crypto']
-            crypto_details = CryptoTransactionDetails(
+            crypto_risk = analysis_result.get('crypto_risk') or {}
+            transaction.crypto_details = CryptoTransactionDetails(
                 address=crypto_data.get('address'),
-                mixer_interaction=analysis_result.get('crypto_risk', {}).get('mixer_interaction', False),
-                suspicious_patterns=analysis_result.get('crypto_risk', {}).get('suspicious_patterns', False),
-                known_risky=analysis_result.get('crypto_risk', {}).get('known_risky', False)
+                mixer_interaction=crypto_risk.get('mixer_interaction', False),
+                suspicious_patterns=crypto_risk.get('suspicious_patterns', False),
+                known_risky=crypto_risk.get('known_risky', False)
             )
-            transaction.crypto_details = crypto_details
         
         return transaction
 
@@ -108,6 +124,10 @@ class Transaction(db.Model):
 class FiatTransactionDetails(db.Model):
     """Fiat transaction specific details"""
     __tablename__ = 'fiat_transaction_details'
+    __table_args__ = (
+        # Loading and deleting a transaction's details looks them up by parent
+        Index('ix_fiat_details_transaction_id', 'transaction_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     transaction_id = Column(Integer, ForeignKey('transactions.id'), nullable=False)
@@ -129,6 +149,10 @@ class FiatTransactionDetails(db.Model):
 class CryptoTransactionDetails(db.Model):
     """Cryptocurrency transaction specific details"""
     __tablename__ = 'crypto_transaction_details'
+    __table_args__ = (
+        # Loading and deleting a transaction's details looks them up by parent
+        Index('ix_crypto_details_transaction_id', 'transaction_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     transaction_id = Column(Integer, ForeignKey('transactions.id'), nullable=False)
@@ -143,4 +167,40 @@ class CryptoTransactionDetails(db.Model):
     known_risky = Column(Boolean, default=False)
     
     def __repr__(self):
-        return f"<CryptoDetails(id={self.id}, address={self.address})>"
\ No newline at end of file
+        return f"<CryptoDetails(id={self.id}, address={self.address})>"
+
+
+def migrate_risk_level_codes(bind) -> None:
+    """
+    Add the risk_level_code column to a transactions table created before it existed,
+    and fill it in for rows stored without one
+    
+    Args:
+        bind: Engine or connection for the database to migrate
+    """
+    with bind.begin() as connection:
+        columns = {column['name'] for column in inspect(connection).get_columns('transactions')}
+        if 'risk_level_code' not in columns:
+            connection.execute(text("ALTER TABLE transactions ADD COLUMN risk_level_code SMALLINT"))
+        
+        connection.execute(
+            Transaction.__table__.update()
+            .where(Transaction.risk_level_code.is_(None))
+            .values(risk_level_code=case(RISK_LEVEL_CODES, value=Transaction.risk_level))
+        )
+
+
+def create_missing_indexes(bind) -> None:
+    """
+    Create the model indexes that tables from older versions are missing
+    
+    create_all only adds indexes along with new tables, so this also covers
+    indexes added to existing ones.
+    
+    Args:
+        bind: Engine or connection for the database to migrate
+    """
+    with bind.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
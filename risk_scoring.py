@@ -1,6 +1,7 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 import logging
 import os
+import joblib
 from config import FIAT_WEIGHT, CRYPTO_WEIGHT
 from utils import normalize_score, get_risk_level
 from fiat_analyzer import FiatTransactionAnalyzer
@@ -32,6 +33,67 @@ class RiskScorer:
             logger.info("Training fiat transaction analyzer")
             self.fiat_analyzer.train(fiat_data)
     
+    def save(self, path: str) -> None:
+        """
+        Persist the trained models to disk
+        
+        Args:
+            path: File to write the models to
+        """
+        state = {
+            'fiat_model': self.fiat_analyzer.model,
+            'fiat_is_trained': self.fiat_analyzer.is_trained,
+            'fiat_feature_columns': self.fiat_analyzer.feature_columns
+        }
+        # Write to a temporary file first so other workers never load a partial model
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved risk models to {path}")
+    
+    def load(self, path: str, mmap_mode: Optional[str] = None) -> None:
+        """
+        Load models previously written by save()
+        
+        Args:
+            path: File to read the models from
+            mmap_mode: Passed to joblib.load; 'r' maps large arrays read-only instead of copying them
+        """
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        feature_columns = state.get('fiat_feature_columns')
+        if state['fiat_is_trained'] and feature_columns is None:
+            # Scoring needs the training columns, so fail here and let load_or_train retrain
+            raise ValueError(f"{path} has a trained fiat model but no feature columns")
+        
+        self.fiat_analyzer.model = state['fiat_model']
+        self.fiat_analyzer.is_trained = state['fiat_is_trained']
+        self.fiat_analyzer.feature_columns = feature_columns
+        logger.info(f"Loaded risk models from {path}")
+    
+    def load_or_train(self, path: str, training_size: int) -> None:
+        """
+        Load models from path, or train them on synthetic data and save them there
+        
+        Args:
+            path: Model file shared by all processes
+            training_size: Number of synthetic transactions to train on if no model file exists
+        """
+        if os.path.exists(path):
+            try:
+                # Memory-map the arrays so processes share one copy in the page cache
+                self.load(path, mmap_mode='r')
+                return
+            except Exception as e:
+                logger.warning(f"Could not load models from {path}, retraining: {e}")
+        
+        # Faker is only imported when training is needed
+        from data_generator import generate_synthetic_fiat_data
+        self.train_models(generate_synthetic_fiat_data(training_size))
+        try:
+            self.save(path)
+        except Exception as e:
+            logger.warning(f"Could not save models to {path}: {e}")
+    
     def analyze_transaction(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze a transaction with both fiat and crypto components
@@ -46,7 +108,55 @@ class RiskScorer:
         Returns:
             Dict[str, Any]: Analysis results with risk score and alerts
         """
-        logger.info(f"Analyzing transaction: {transaction}")
+        return self.analyze_batch([transaction])[0]
+    
+    def analyze_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several transactions, scoring all fiat components with a single model call
+        
+        Args:
+            transactions: List of transaction dictionaries (see analyze_transaction)
+        
+        Returns:
+            List[Dict[str, Any]]: Analysis results for each transaction, in input order
+        """
+        return [
+            self.complete_analysis(transaction, fiat_result)
+            for transaction, fiat_result in zip(transactions, self.analyze_fiat_batch(transactions))
+        ]
+    
+    def analyze_fiat_batch(self, transactions: List[Dict[str, Any]]) -> List[Optional[Tuple[float, List[str]]]]:
+        """
+        Score the fiat components of several transactions with a single model call
+        
+        Args:
+            transactions: List of transaction dictionaries (see analyze_transaction)
+        
+        Returns:
+            List[Optional[Tuple[float, List[str]]]]: Fiat risk score (0-1) and alerts for each
+            transaction, or None where there is no fiat component
+        """
+        fiat_indices = [i for i, t in enumerate(transactions) if t.get('fiat')]
+        fiat_results: List[Optional[Tuple[float, List[str]]]] = [None] * len(transactions)
+        if fiat_indices:
+            batch_results = self.fiat_analyzer.analyze_batch([transactions[i]['fiat'] for i in fiat_indices])
+            for i, fiat_result in zip(fiat_indices, batch_results):
+                fiat_results[i] = fiat_result
+        return fiat_results
+    
+    def complete_analysis(self, transaction: Dict[str, Any],
+                          fiat_result: Optional[Tuple[float, List[str]]]) -> Dict[str, Any]:
+        """
+        Run the crypto analysis and combine it with a fiat result from analyze_fiat_batch
+        
+        Args:
+            transaction: Dictionary with 'fiat' and 'crypto' components
+            fiat_result: Fiat risk score (0-1) and alerts, or None if there is no fiat component
+        
+        Returns:
+            Dict[str, Any]: Analysis results with risk score and alerts
+        """
+        logger.debug("Analyzing transaction: %r", transaction)
         
         # Initialize results
         results = {
@@ -61,16 +171,13 @@ class RiskScorer:
         fiat_risk_score = 0
         fiat_alerts = []
         has_fiat = False
-        if 'fiat' in transaction and transaction['fiat']:
+        if fiat_result is not None:
             has_fiat = True
-            fiat_risk_score, fiat_alerts = self.fiat_analyzer.analyze(transaction['fiat'])
+            fiat_risk_score, fiat_alerts = fiat_result
             results['fiat_risk'] = {
-                'score': round(fiat_risk_score * 100, 2),
+                'score': round(float(fiat_risk_score) * 100, 2),
                 'alerts': fiat_alerts
             }
-            
-            # Add prefix to fiat alerts for combined list
-            fiat_alerts = [f"Fiat: {alert}" for alert in fiat_alerts]
         
         # Analyze crypto component if present
         crypto_risk_score = 0
@@ -83,13 +190,14 @@ class RiskScorer:
         eth_proportion = 1.0
         usdc_proportion = 0.0
         
-        if 'crypto' in transaction and transaction['crypto']:
+        crypto = transaction.get('crypto')
+        if crypto:
             has_crypto = True
-            address = transaction['crypto'].get('address')
-            currency = transaction['crypto'].get('currency')
+            address = crypto.get('address')
+            currency = crypto.get('currency')
             
             # Basic crypto analysis
-            crypto_risk_score, crypto_alerts = self.crypto_analyzer.analyze(transaction['crypto'])
+            crypto_risk_score, crypto_alerts = self.crypto_analyzer.analyze(crypto)
             eth_risk = crypto_risk_score
             
             # If it's USDC, perform additional USDC-specific analysis
@@ -114,12 +222,9 @@ class RiskScorer:
             
             # Store crypto risk results
             results['crypto_risk'] = {
-                'score': round(crypto_risk_score * 100, 2),
+                'score': round(float(crypto_risk_score) * 100, 2),
                 'alerts': crypto_alerts
             }
-            
-            # Add prefix to crypto alerts for combined list
-            crypto_alerts = [f"Crypto: {alert}" for alert in crypto_alerts]
         
         # Calculate combined risk score using 50/50 weighting
         if has_fiat and has_crypto:
@@ -134,15 +239,18 @@ class RiskScorer:
             # No components (shouldn't happen)
             combined_risk = 0.0
         
-        # Convert to 0-100 scale
-        normalized_risk = round(combined_risk * 100, 2)
+        # Convert to 0-100 scale; float() drops NumPy scalar types so the result serializes directly
+        normalized_risk = round(float(combined_risk) * 100, 2)
         results['risk_score'] = normalized_risk
         results['risk_level'] = get_risk_level(normalized_risk)
         
-        # Combine alerts
-        results['alerts'] = fiat_alerts + crypto_alerts
+        # Combine alerts, prefixed with their channel; clean transactions skip this entirely
+        if fiat_alerts:
+            results['alerts'].extend(f"Fiat: {alert}" for alert in fiat_alerts)
+        if crypto_alerts:
+            results['alerts'].extend(f"Crypto: {alert}" for alert in crypto_alerts)
         
-        logger.info(f"Risk analysis complete: score={normalized_risk}, level={results['risk_level']}")
+        logger.info("Risk analysis complete: score=%s, level=%s", normalized_risk, results['risk_level'])
         return results
     
 
@@ -317,7 +317,7 @@ def display_analysis_results(results):
 
 def fetch_transaction_history(
     limit=20, 
-    offset=0, 
+    cursor=None, 
     min_risk=None, 
     max_risk=None, 
     transaction_type=None
@@ -327,7 +327,7 @@ def fetch_transaction_history(
     
     Args:
         limit: Maximum number of transactions
-        offset: Pagination offset
+        cursor: next_cursor from the previous page, or None for the newest transactions
         min_risk: Minimum risk score
         max_risk: Maximum risk score
         transaction_type: Filter by transaction type
@@ -335,7 +335,10 @@ def fetch_transaction_history(
     Returns:
         dict: Transaction history data
     """
-    params = {"limit": limit, "offset": offset}
+    params = {"limit": limit}
+    
+    if cursor is not None:
+        params["cursor"] = cursor
     
     if min_risk is not None:
         params["min_risk"] = min_risk
@@ -352,7 +355,7 @@ def fetch_transaction_history(
         return response.json()
     except Exception as e:
         st.error(f"Error fetching transaction history: {e}")
-        return {"transactions": [], "total": 0}
+        return {"transactions": [], "next_cursor": None}
 
 def show_transaction_history():
     """Display transaction history page"""
@@ -392,19 +395,35 @@ def show_transaction_history():
         index=1
     )
     
+    # Cursors of the pages viewed so far, starting with the newest page;
+    # changing any filter starts again from the first page
+    filters = (min_risk, max_risk, transaction_type, items_per_page)
+    if st.session_state.get("history_filters") != filters:
+        st.session_state.history_filters = filters
+        st.session_state.history_cursors = [None]
+    
     # Fetch data
     history_data = fetch_transaction_history(
         limit=items_per_page,
+        cursor=st.session_state.history_cursors[-1],
         min_risk=min_risk if min_risk > 0 else None,
         max_risk=max_risk if max_risk < 100 else None,
         transaction_type=transaction_type
     )
     
-    total_count = history_data.get("total", 0)
     transactions = history_data.get("transactions", [])
-    
-    # Total statistics
-    st.metric(label="Total Transactions", value=total_count)
+    next_cursor = history_data.get("next_cursor")
+    
+    # Page statistics
+    st.metric(label="Transactions Shown", value=len(transactions))
+    
+    prev_col, next_col = st.sidebar.columns(2)
+    if prev_col.button("Previous page", disabled=len(st.session_state.history_cursors) == 1):
+        st.session_state.history_cursors.pop()
+        st.rerun()
+    if next_col.button("Next page", disabled=next_cursor is None):
+        st.session_state.history_cursors.append(next_cursor)
+        st.rerun()
     
     if transactions:
         # Convert to dataframe for display
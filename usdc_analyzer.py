@@ -5,11 +5,13 @@ This module analyzes USDC (ERC-20) transactions on Ethereum blockchain
 
 import os
 import logging
-import requests
 import time
 import json
+import orjson
 from typing import Dict, Any, List, Tuple, Optional
 from risky_addresses import RISKY_ADDRESSES_WITH_SCORES
+from config import ETHERSCAN_TIMEOUT
+from utils import create_etherscan_session
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,6 +20,9 @@ logger = logging.getLogger(__name__)
 USDC_CONTRACT_ADDRESS = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"  # USDC contract on Ethereum
 ETHERSCAN_BASE_URL = "https://api.etherscan.io/api"
 
+# Shared by all lookups so connections to Etherscan are reused
+_session = create_etherscan_session()
+
 class EtherscanRateLimiter:
     """Class to handle rate limiting for Etherscan API"""
     def __init__(self, requests_per_second: int = 5):
@@ -28,11 +33,11 @@ class EtherscanRateLimiter:
             requests_per_second: Maximum number of requests per second
         """
         self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0
+        self.last_request_time = float('-inf')
         
     def wait_if_needed(self):
         """Wait if necessary to respect the rate limit"""
-        current_time = time.time()
+        current_time = time.perf_counter()
         elapsed = current_time - self.last_request_time
         
         if elapsed < self.min_interval:
@@ -41,7 +46,7 @@ class EtherscanRateLimiter:
             time.sleep(wait_time)
             
         # Update last request time
-        self.last_request_time = time.time()
+        self.last_request_time = time.perf_counter()
 
 def analyze_usdc_erc20_transactions(address: str, etherscan_api_key: Optional[str] = None) -> float:
     """
@@ -101,13 +106,13 @@ def get_usdc_transactions(address: str, api_key: str, rate_limiter: EtherscanRat
             'apikey': api_key
         }
         
-        response = requests.get(ETHERSCAN_BASE_URL, params=params)
+        response = _session.get(ETHERSCAN_BASE_URL, params=params, timeout=ETHERSCAN_TIMEOUT)
         
         if response.status_code != 200:
             logger.error(f"API request failed with status code: {response.status_code}")
             return None
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data['status'] != '1':
             logger.warning(f"API returned error: {data.get('message', 'Unknown error')}")
@@ -1,11 +1,45 @@
+import re
 import json
 import logging
+from bisect import bisect_right
+from functools import lru_cache
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, List, Tuple, Optional
+from config import (
+    VALIDATION_CACHE_SIZE, ETHERSCAN_POOL_SIZE, ETHERSCAN_RETRIES,
+    LOW_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD, HIGH_RISK_THRESHOLD
+)
 
 logger = logging.getLogger(__name__)
 
+# Validation patterns, compiled once at import
+_IP_RE = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
+_ETH_RE = re.compile(r'^0x[a-fA-F0-9]{40}$')
+
+# ISO 3166-1 alpha-2 country codes
+ISO_COUNTRY_CODES = frozenset([
+    'AD', 'AE', 'AF', 'AG', 'AI', 'AL', 'AM', 'AO', 'AQ', 'AR', 'AS', 'AT', 'AU', 'AW', 'AX', 'AZ',
+    'BA', 'BB', 'BD', 'BE', 'BF', 'BG', 'BH', 'BI', 'BJ', 'BL', 'BM', 'BN', 'BO', 'BQ', 'BR', 'BS',
+    'BT', 'BV', 'BW', 'BY', 'BZ', 'CA', 'CC', 'CD', 'CF', 'CG', 'CH', 'CI', 'CK', 'CL', 'CM', 'CN',
+    'CO', 'CR', 'CU', 'CV', 'CW', 'CX', 'CY', 'CZ', 'DE', 'DJ', 'DK', 'DM', 'DO', 'DZ', 'EC', 'EE',
+    'EG', 'EH', 'ER', 'ES', 'ET', 'FI', 'FJ', 'FK', 'FM', 'FO', 'FR', 'GA', 'GB', 'GD', 'GE', 'GF',
+    'GG', 'GH', 'GI', 'GL', 'GM', 'GN', 'GP', 'GQ', 'GR', 'GS', 'GT', 'GU', 'GW', 'GY', 'HK', 'HM',
+    'HN', 'HR', 'HT', 'HU', 'ID', 'IE', 'IL', 'IM', 'IN', 'IO', 'IQ', 'IR', 'IS', 'IT', 'JE', 'JM',
+    'JO', 'JP', 'KE', 'KG', 'KH', 'KI', 'KM', 'KN', 'KP', 'KR', 'KW', 'KY', 'KZ', 'LA', 'LB', 'LC',
+    'LI', 'LK', 'LR', 'LS', 'LT', 'LU', 'LV', 'LY', 'MA', 'MC', 'MD', 'ME', 'MF', 'MG', 'MH', 'MK',
+    'ML', 'MM', 'MN', 'MO', 'MP', 'MQ', 'MR', 'MS', 'MT', 'MU', 'MV', 'MW', 'MX', 'MY', 'MZ', 'NA',
+    'NC', 'NE', 'NF', 'NG', 'NI', 'NL', 'NO', 'NP', 'NR', 'NU', 'NZ', 'OM', 'PA', 'PE', 'PF', 'PG',
+    'PH', 'PK', 'PL', 'PM', 'PN', 'PR', 'PS', 'PT', 'PW', 'PY', 'QA', 'RE', 'RO', 'RS', 'RU', 'RW',
+    'SA', 'SB', 'SC', 'SD', 'SE', 'SG', 'SH', 'SI', 'SJ', 'SK', 'SL', 'SM', 'SN', 'SO', 'SR', 'SS',
+    'ST', 'SV', 'SX', 'SY', 'SZ', 'TC', 'TD', 'TF', 'TG', 'TH', 'TJ', 'TK', 'TL', 'TM', 'TN', 'TO',
+    'TR', 'TT', 'TV', 'TW', 'TZ', 'UA', 'UG', 'UM', 'US', 'UY', 'UZ', 'VA', 'VC', 'VE', 'VG', 'VI',
+    'VN', 'VU', 'WF', 'WS', 'YE', 'YT', 'ZA', 'ZM', 'ZW'
+])
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def is_valid_ip(ip: str) -> bool:
     """
     Validate if the provided string is a valid IP address
@@ -16,9 +50,7 @@ def is_valid_ip(ip: str) -> bool:
     Returns:
         bool: True if valid IP, False otherwise
     """
-    import re
-    pattern = r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$'
-    match = re.match(pattern, ip)
+    match = _IP_RE.match(ip)
     if not match:
         return False
     
@@ -29,6 +61,7 @@ def is_valid_ip(ip: str) -> bool:
     
     return True
 
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def is_valid_eth_address(address: str) -> bool:
     """
     Validate if the provided string is a valid Ethereum address
@@ -39,10 +72,22 @@ def is_valid_eth_address(address: str) -> bool:
     Returns:
         bool: True if valid Ethereum address, False otherwise
     """
-    import re
     # Basic Ethereum address validation (starts with 0x followed by 40 hex chars)
-    pattern = r'^0x[a-fA-F0-9]{40}$'
-    return bool(re.match(pattern, address))
+    return bool(_ETH_RE.match(address))
+
+def create_etherscan_session() -> requests.Session:
+    """
+    Create a session that keeps connections to Etherscan open and retries transient failures
+    
+    Returns:
+        requests.Session: Session with a sized connection pool and retry policy
+    """
+    retry = Retry(total=ETHERSCAN_RETRIES, backoff_factor=0.2,
+                  status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=ETHERSCAN_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
 
 def get_country_from_ip(ip: str) -> Optional[str]:
     """
@@ -99,6 +144,12 @@ def format_alerts(alerts: List[str]) -> str:
     
     return "\n".join([f"• {alert}" for alert in alerts])
 
+# Risk levels in ascending order; a level's position is its stored risk_level_code
+RISK_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+RISK_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+# Lowest score of each level above Low, in the same order as RISK_LEVELS
+_RISK_LEVEL_CUTOFFS = (LOW_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD, HIGH_RISK_THRESHOLD)
+
 def get_risk_level(score: float) -> str:
     """
     Get the risk level based on the score
@@ -109,13 +160,4 @@ def get_risk_level(score: float) -> str:
     Returns:
         str: Risk level (Low, Medium, High, Critical)
     """
-    from config import LOW_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD, HIGH_RISK_THRESHOLD
-    
-    if score < LOW_RISK_THRESHOLD:
-        return "Low"
-    elif score < MEDIUM_RISK_THRESHOLD:
-        return "Medium"
-    elif score < HIGH_RISK_THRESHOLD:
-        return "High"
-    else:
-        return "Critical"
+    return RISK_LEVELS[bisect_right(_RISK_LEVEL_CUTOFFS, score)]